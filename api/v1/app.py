@@ -7,10 +7,31 @@ to Flask instance app.
 from api.v1.views import app_views
 from flask_cors import CORS
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from models import storage
+from models.engine import json_backend
 from os import getenv
 
+
+class JSONProvider(DefaultJSONProvider):
+    """reads and writes the JSON of the API with the JSON backend of the
+    models"""
+
+    def dumps(self, obj, **kwargs):
+        """returns the JSON text of obj; the indented text of debug mode
+        is left to the json module"""
+        if kwargs.get("indent") is not None:
+            return super().dumps(obj, **kwargs)
+        return json_backend.dumps(obj, kwargs.get("sort_keys",
+                                                  self.sort_keys))
+
+    def loads(self, s, **kwargs):
+        """returns the value of the JSON text s"""
+        return json_backend.loads(s)
+
+
 app = Flask(__name__)
+app.json = JSONProvider(app)
 
 CORS(app, resources={r'/api/v1/*': {'origins': '0.0.0.0'}})
 
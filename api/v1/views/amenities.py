@@ -5,15 +5,24 @@ all default RESTful API actions.
 """
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.paging import list_response, page_args
 from flask import abort, jsonify, request
 from models.amenity import Amenity
 from models import storage
 
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
+@conditional(Amenity)
+@cached(Amenity)
 def retrieve_all():
     """Retrieves the list of all Amenity objects"""
-    amenities = storage.all(Amenity).values()
-    return jsonify([amenity.to_dict() for amenity in amenities])
+    limit, after = page_args()
+    if limit is not None:
+        amenities = storage.page(Amenity, limit, after)
+    else:
+        amenities = storage.all(Amenity).values()
+    return list_response(amenities, limit)
 
 @app_views.route('/amenities/<amenity_id>',
                  methods=['GET'], strict_slashes=False)
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""
+In-process LRU caches of GET responses and of search results,
+invalidated by storage versions.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from api.v1.views.conditional import storage_version
+from api.v1.views.singleflight import coalesce
+from flask import current_app, request
+from os import getenv
+import threading
+import time
+
+
+class LRUCache:
+    """an LRU cache bounded by entries and by the sizes of its values,
+    keeping each value at most ttl seconds if ttl is given
+
+    Every entry keeps the version tag it was built at; an entry looked
+    up with another tag is stale and is evicted.
+    """
+
+    def __init__(self, max_entries, max_bytes, ttl=None):
+        """creates an empty cache; max_entries 0 disables it"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key, tag):
+        """returns the value cached for key at version tag, or None"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and (entry[0] != tag or
+                                      entry[1] < time.monotonic()):
+                self.__evict(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, tag, value, size):
+        """caches value, of size bytes, for key at version tag, evicting
+        the least recently used entries over the bounds"""
+        if size > self.max_bytes or not self.max_entries:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self.__lock:
+            self.__evict(key)
+            self.__entries[key] = (tag, expires, value, size)
+            self.__bytes += size
+            while (len(self.__entries) > self.max_entries or
+                   self.__bytes > self.max_bytes):
+                self.__evict(next(iter(self.__entries)))
+
+    def __evict(self, key):
+        """removes the entry of key, if any; the caller holds the lock"""
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__bytes -= entry[3]
+
+    def clear(self):
+        """removes every entry"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def stats(self):
+        """returns the hit and miss counters and the size of the cache"""
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self.__entries), 'bytes': self.__bytes}
+
+
+# (status, headers, body) of GET responses, by path and query string
+response_cache = LRUCache(
+    int(getenv('HBNB_API_CACHE_ENTRIES', 1024)),
+    int(getenv('HBNB_API_CACHE_BYTES', 64 * 1024 * 1024)))
+# sorted ids of the places found, by canonical search criteria
+search_cache = LRUCache(
+    int(getenv('HBNB_API_SEARCH_CACHE_ENTRIES', 1024)),
+    int(getenv('HBNB_API_SEARCH_CACHE_BYTES', 32 * 1024 * 1024)),
+    float(getenv('HBNB_API_SEARCH_CACHE_TTL', 60)))
+
+
+def cached(*classes):
+    """
+    Decorates a GET view to cache its 200 responses by path and query
+    string until the storage version of one of classes changes; the
+    identical requests missing the cache at once share one response.
+
+    Args:
+        classes: The classes the response is built from, none for all
+        classes.
+    """
+    def decorator(view):
+        """wraps view"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            """serves the cached response while the versions match"""
+            key = request.full_path
+            tag = " ".join(storage_version(cls)[0]
+                           for cls in classes or (None,))
+            entry = response_cache.get(key, tag)
+            if entry is not None:
+                status, headers, body = entry
+                return current_app.response_class(body, status, headers)
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            def keep(status, headers, body):
+                """caches the response sent"""
+                response_cache.put(key, tag, (status, headers, body),
+                                   len(body))
+            return coalesce((key, tag), lambda: view(*args, **kwargs),
+                            response_cache.max_bytes, keep)
+        return wrapper
+    return decorator
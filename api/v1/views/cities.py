@@ -5,12 +5,15 @@ all default RESTful API actions.
 """
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.paging import list_response, page_args
 from flask import abort, jsonify, request
 from models.city import City
 from models import storage
 from models.state import State
 
 @app_views.route('/states/<state_id>/cities', methods=['GET'], strict_slashes=False)
+@cached(State, City)
 def get_cities_for_state(state_id):
     """
     Retrieve the list of all City objects associated with a State.
@@ -27,8 +30,12 @@ def get_cities_for_state(state_id):
     if not state:
         abort(404)
 
-    cities = [city.to_dict() for city in state.cities]
-    return jsonify(cities)
+    limit, after = page_args()
+    if limit is not None:
+        cities = storage.page(City, limit, after, "state_id", state.id)
+    else:
+        cities = state.cities
+    return list_response(cities, limit)
 
 @app_views.route('/cities/<city_id>', methods=['GET'], strict_slashes=False)
 def get_city_by_id(city_id):
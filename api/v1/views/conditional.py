@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Conditional GET for views whose response only depends on the objects
+of a class, or on all objects.
+"""
+
+from functools import wraps
+from flask import current_app, make_response, request
+from models import storage
+
+
+def storage_version(cls=None):
+    """returns storage.version(cls), read once per request"""
+    versions = request.environ.setdefault('hbnb.storage_versions', {})
+    if cls not in versions:
+        versions[cls] = storage.version(cls)
+    return versions[cls]
+
+
+def conditional(cls=None):
+    """
+    Decorates a view to send ETag and Last-Modified from
+    storage.version(cls), and to answer a matching If-None-Match with
+    304 without calling the view.
+
+    Args:
+        cls: The class the response is built from, None for all classes.
+    """
+    def decorator(view):
+        """wraps view"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            """answers 304 while the version is unchanged"""
+            tag, modified = storage_version(cls)
+            if request.if_none_match.contains_weak(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+            response.set_etag(tag)
+            if modified is not None:
+                response.last_modified = modified
+            return response
+        return wrapper
+    return decorator
@@ -6,6 +6,9 @@ that returns a JSON: "status": "OK"
 
 
 from api.v1.views import app_views
+from api.v1.views.cache import response_cache, search_cache
+from api.v1.views.singleflight import flights
+from api.v1.views.conditional import conditional
 from flask import jsonify
 from models import storage
 
@@ -18,18 +21,32 @@ def api_status():
     return jsonify(response)
 
 
+@app_views.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Returns:
+    A JSON response with the hit and miss counters and the size of the
+    response cache, and the number of requests that computed or shared
+    a response, and the counters of the search results cache."""
+    stats = response_cache.stats()
+    stats.update(flights.stats())
+    stats['search'] = search_cache.stats()
+    return jsonify(stats)
+
+
 @app_views.route('/stats', methods=['GET'])
+@conditional()
 def get_stats():
     """
     This function retrieves the number of objects
     for each class.
     """
+    counts = storage.counts()
     stats = {
-        'amenities': storage.count('Amenity'),
-        'cities': storage.count('City'),
-        'places': storage.count('Place'),
-        'reviews': storage.count('Review'),
-        'states': storage.count('State'),
-        'users': storage.count('User')
+        'amenities': counts['Amenity'],
+        'cities': counts['City'],
+        'places': counts['Place'],
+        'reviews': counts['Review'],
+        'states': counts['State'],
+        'users': counts['User']
     }
     return jsonify(stats)
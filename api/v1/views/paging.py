@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+"""
+Cursor pagination and streaming helpers for the list endpoints.
+
+A page is asked with ?limit=<n> and ?cursor=<opaque>; objects are listed
+in the order of their ids and the cursor of the next page, if any, is
+sent back in the X-Next-Cursor header. A cursor is only valid on the
+path that sent it. Lists are streamed as a JSON array joined from the
+JSON text each object caches.
+"""
+
+from base64 import b64decode, urlsafe_b64encode
+from binascii import Error
+from flask import Response, abort, current_app, request
+from flask import stream_with_context
+from zlib import crc32
+
+# page size when only a cursor is given, and largest page size allowed
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# number of objects in each chunk of a streamed list
+CHUNK_OBJECTS = 256
+
+
+def encode_cursor(id, path):
+    """returns the opaque cursor of the page of path starting after id"""
+    data = crc32(path.encode()).to_bytes(4, "big") + id.encode()
+    return urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor, path):
+    """returns the id that cursor starts after, or raises ValueError if
+    cursor was not sent by path"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    data = b64decode(padded, altchars=b"-_", validate=True)
+    if data[:4] != crc32(path.encode()).to_bytes(4, "big"):
+        raise ValueError("cursor of another list")
+    return data[4:].decode()
+
+
+def page_args():
+    """
+    Reads ?limit= and ?cursor= from the request.
+
+    Returns:
+        (limit, after): the page size and the id the page starts after,
+        or (None, None) when the whole list is asked.
+
+    Raises:
+        400: If the limit is not a positive integer or the cursor is
+        not one sent by this API.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_LIMIT
+    except ValueError:
+        abort(400, description="Invalid limit")
+    if limit < 1:
+        abort(400, description="Invalid limit")
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, request.path)
+        except (Error, UnicodeDecodeError, ValueError):
+            abort(400, description="Invalid cursor")
+    return min(limit, MAX_LIMIT), after
+
+
+def stream_list(objs):
+    """yields the JSON array of the objects of objs, in chunks of
+    CHUNK_OBJECTS objects"""
+    batch, sep = [], "["
+    for obj in objs:
+        batch.append(obj.to_json())
+        if len(batch) == CHUNK_OBJECTS:
+            yield sep + ",".join(batch)
+            batch, sep = [], ","
+    if batch:
+        yield sep + ",".join(batch) + "]\n"
+    else:
+        yield "[]\n" if sep == "[" else "]\n"
+
+
+def list_response(objs, limit=None):
+    """
+    Builds the streamed JSON list response of objs.
+
+    Args:
+        objs: The objects of the list, or of the page.
+        limit (int): The page size, None when objs is the whole list.
+
+    Returns:
+        The response, with X-Next-Cursor set when objs is a full page.
+    """
+    headers = {}
+    if limit is not None:
+        objs = list(objs)
+        if len(objs) == limit:
+            headers['X-Next-Cursor'] = encode_cursor(objs[-1].id,
+                                                     request.path)
+    body = stream_with_context(stream_list(objs))
+    return Response(body, mimetype=current_app.json.mimetype,
+                    headers=headers)
@@ -4,18 +4,25 @@ Creates an endpoint for Place objects managing all
 default RESTful API actions.
 """
 
-from models.amenity import Amenity
 from models.city import City
 from models.place import Place
 from models.state import State
 from models.user import User
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache, search_cache
+from api.v1.views.conditional import storage_version
+from api.v1.views.paging import list_response, page_args
+from api.v1.views.singleflight import coalesce
+from bisect import bisect_right
 from flask import abort, jsonify, request
+import json
+import sys
 from models import storage
 
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'], strict_slashes=False)
+@cached(City, Place)
 def retrieve_places_by_city(city_id):
     """
     Gets the list of all Place objects of a City.
@@ -23,8 +30,12 @@ def retrieve_places_by_city(city_id):
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    places = [place.to_dict() for place in city.places]
-    return jsonify(places)
+    limit, after = page_args()
+    if limit is not None:
+        places = storage.page(Place, limit, after, "city_id", city.id)
+    else:
+        places = city.places
+    return list_response(places, limit)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
@@ -134,53 +145,74 @@ def search_places():
 
     data = request.get_json()
 
+    states = cities = amenities = None
     if data and len(data):
         states = data.get('states', None)
         cities = data.get('cities', None)
         amenities = data.get('amenities', None)
 
-    if not data or not len(data) or (
-            not states and
-            not cities and
-            not amenities):
-        places = storage.all(Place).values()
-        places_list = []
-        for p in places:
-            places_list.append(p.to_dict())
-        return jsonify(places_list)
-
-    places_list = []
-
-    if states:
-        objs_of_states = [storage.get(State, s_id) for s_id in states]
-        for state in objs_of_states:
-            if state:
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            places_list.append(place)
-
-    if cities:
-        city_obj = [storage.get(City, c_id) for c_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in places_list:
-                        places_list.append(place)
-
-    if amenities:
-        if not places_list:
-            places_list = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
-
-        places_list = [place for place in places_list
-                       if all([am in place.amenities
-                               for am in amenities_obj])]
-
-    places = []
-    for p in places_list:
-        place_dict = p.to_dict()
-        place_dict.pop('amenities', None)
-        places.append(place_dict)
-
-    return jsonify(places)
+    limit, after = page_args()
+    criteria = search_criteria(states, cities, amenities)
+
+    def view():
+        """streams the places found, or the page of them asked"""
+        return list_response(search_page(states, cities, amenities, after,
+                                         limit), limit)
+    if criteria == "{}":
+        # every place, paged by the storage and never cached: streamed
+        # without keeping a copy to share
+        return view()
+    tag = " ".join(storage_version(cls)[0] for cls in (State, City, Place))
+    return coalesce((request.full_path, criteria, tag), view,
+                    response_cache.max_bytes)
+
+
+def search_page(states, cities, amenities, after, limit):
+    """
+    Returns the places found by a search, or the page of them asked.
+    The sorted ids of the places found are cached by the canonical form
+    of the search until a State, City or Place changes, and only the
+    places of the page are loaded; a search with no criteria, for every
+    place, is paged by the storage instead.
+    """
+    criteria = search_criteria(states, cities, amenities)
+    if criteria == "{}":
+        return storage.search_places(after=after, limit=limit)
+    tag = " ".join(storage_version(cls)[0] for cls in (State, City, Place))
+    ids = search_cache.get(criteria, tag)
+    if ids is None and limit is None:
+        # every place is loaded anyway: load them with the search
+        places = sorted(storage.search_places(states, cities, amenities),
+                        key=lambda place: place.id)
+        keep_ids(criteria, tag, tuple(place.id for place in places))
+        return places
+    if ids is None:
+        ids = tuple(sorted(storage.search_places(states, cities, amenities,
+                                                 ids_only=True)))
+        keep_ids(criteria, tag, ids)
+    if limit is not None:
+        start = bisect_right(ids, after) if after is not None else 0
+        ids = ids[start:start + limit]
+    return storage.get_many(Place, ids)
+
+
+def keep_ids(criteria, tag, ids):
+    """
+    Caches the sorted ids found by a search, charging the strings along
+    with the tuple holding them.
+    """
+    search_cache.put(criteria, tag, ids,
+                     sys.getsizeof(ids) + sum(map(sys.getsizeof, ids)))
+
+
+def search_criteria(states, cities, amenities):
+    """
+    Returns the canonical form of a search: two searches for the same
+    places have the same one.
+    """
+    criteria = {}
+    for name, ids in (('states', states), ('cities', cities),
+                      ('amenities', amenities)):
+        if ids:
+            criteria[name] = sorted(set(map(str, ids)))
+    return json.dumps(criteria, sort_keys=True)
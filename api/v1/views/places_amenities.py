@@ -5,6 +5,7 @@ from models.place import Place
 from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached
 from os import environ
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
@@ -14,6 +15,7 @@ from flasgger.utils import swag_from
                  strict_slashes=False)
 @swag_from('documentation/place_amenity/get_places_amenities.yml',
            methods=['GET'])
+@cached(Place, Amenity)
 def retrieve_place_amenities(place_id):
     """
     Retrieves the list of all Amenity objects associated with a given Place.
@@ -36,8 +38,8 @@ def retrieve_place_amenities(place_id):
     if environ.get('HBNB_TYPE_STORAGE') == "db":
         amenities = [amenity.to_dict() for amenity in place.amenities]
     else:
-        amenities = [storage.get(Amenity, amenity_id).to_dict()
-                     for amenity_id in place.amenity_ids]
+        amenities = [amenity.to_dict() for amenity in
+                     storage.get_many(Amenity, place.amenity_ids)]
 
     return jsonify(amenities)
 
@@ -70,14 +72,8 @@ def remove_place_amenity(place_id, amenity_id):
     if not amenity:
         abort(404)
 
-    if environ.get('HBNB_TYPE_STORAGE') == "db":
-        if amenity not in place.amenities:
-            abort(404)
-        place.amenities.remove(amenity)
-    else:
-        if amenity_id not in place.amenity_ids:
-            abort(404)
-        place.amenity_ids.remove(amenity_id)
+    if not storage.unlink_amenity(place, amenity):
+        abort(404)
 
     storage.save()
     return make_response(jsonify({}), 200)
@@ -112,16 +108,8 @@ def link_place_amenity(place_id, amenity_id):
     if not amenity:
         abort(404)
 
-    if environ.get('HBNB_TYPE_STORAGE') == "db":
-        if amenity in place.amenities:
-            return make_response(jsonify(amenity.to_dict()), 200)
-        else:
-            place.amenities.append(amenity)
-    else:
-        if amenity_id in place.amenity_ids:
-            return make_response(jsonify(amenity.to_dict()), 200)
-        else:
-            place.amenity_ids.append(amenity_id)
+    if not storage.link_amenity(place, amenity):
+        return make_response(jsonify(amenity.to_dict()), 200)
 
     storage.save()
     return make_response(jsonify(amenity.to_dict()), 201)
@@ -7,11 +7,14 @@ from models.user import User
 from models import storage
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.paging import list_response, page_args
 from flask import abort, jsonify, request
 
 
 @app_views.route('/places/<place_id>/reviews', methods=['GET'],
                  strict_slashes=False)
+@cached(Place, Review)
 def retrieve_reviews_for_place(place_id):
     """
     Retrieves the list of all reviews associated with a specific place.
@@ -30,8 +33,12 @@ def retrieve_reviews_for_place(place_id):
     if not place:
         abort(404)
 
-    reviews = [review.to_dict() for review in place.reviews]
-    return jsonify(reviews)
+    limit, after = page_args()
+    if limit is not None:
+        reviews = storage.page(Review, limit, after, "place_id", place.id)
+    else:
+        reviews = place.reviews
+    return list_response(reviews, limit)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'],
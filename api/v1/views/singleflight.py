@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+Coalescing of identical concurrent requests: the first one computes the
+response, the others wait for it and send the same body.
+"""
+
+from flask import current_app, make_response
+from os import getenv
+import threading
+
+# seconds a request waits for an identical one before computing its own
+WAIT = float(getenv('HBNB_API_COALESCE_WAIT', 30))
+
+
+class Flight:
+    """a computation in progress and its result once finished"""
+
+    def __init__(self):
+        """creates an unfinished Flight"""
+        self.result = None
+        self.__done = threading.Event()
+
+    def finish(self, result):
+        """publishes result, None if the computation failed"""
+        self.result = result
+        self.__done.set()
+
+    def wait(self, timeout):
+        """returns the result, None if it failed or is not ready within
+        timeout seconds"""
+        self.__done.wait(timeout)
+        return self.result
+
+
+class SingleFlight:
+    """the computations in progress, by key
+
+    The first caller of a key leads its Flight and must finish it; the
+    callers joining while it runs share its result.
+    """
+
+    def __init__(self):
+        """creates a SingleFlight with no computation in progress"""
+        self.leaders = 0
+        self.followers = 0
+        self.__flights = {}
+        self.__lock = threading.Lock()
+
+    def join(self, key):
+        """returns (flight, True) for the leader of key, else
+        (flight, False)"""
+        with self.__lock:
+            flight = self.__flights.get(key)
+            if flight is not None:
+                self.followers += 1
+                return flight, False
+            self.leaders += 1
+            flight = self.__flights[key] = Flight()
+            return flight, True
+
+    def finish(self, key, flight, result):
+        """ends the flight of key with result"""
+        with self.__lock:
+            if self.__flights.get(key) is flight:
+                del self.__flights[key]
+        flight.finish(result)
+
+    def stats(self):
+        """returns the number of computations led and shared"""
+        with self.__lock:
+            return {'leaders': self.leaders, 'followers': self.followers,
+                    'in_flight': len(self.__flights)}
+
+
+flights = SingleFlight()
+
+
+def coalesce(key, view, limit, on_result=None):
+    """
+    Returns the response of view(), computed once for all the concurrent
+    requests with the same key.
+
+    The body of a streamed response is sent to its request as it is
+    computed and copied up to limit bytes; once it ends, the waiting
+    requests get the copy. When the body grows over limit bytes, the
+    copy is dropped and the others compute their own.
+
+    Args:
+        key: What makes two requests identical.
+        view: The function computing the response.
+        limit (int): The largest body, in bytes, kept to be shared.
+        on_result: Called with the status, headers and body of a 200
+        response kept to be shared.
+    """
+    flight, leader = flights.join(key)
+    if not leader:
+        result = flight.wait(WAIT)
+        if result is not None:
+            return current_app.response_class(result[2], result[0],
+                                              result[1])
+        return view()
+    try:
+        response = make_response(view())
+    except BaseException:
+        flights.finish(key, flight, None)
+        raise
+    if response.status_code != 200:
+        flights.finish(key, flight, None)
+        return response
+    headers = [(name, value) for name, value in response.headers
+               if name != 'Content-Length']
+    if response.is_streamed:
+        response.response = tee(key, flight, response.response, headers,
+                                limit, on_result)
+        return response
+    publish(key, flight, (200, headers, response.get_data()), limit,
+            on_result)
+    return response
+
+
+def publish(key, flight, result, limit, on_result):
+    """finishes flight with result, or with None if its body is over
+    limit bytes, and passes the result kept to on_result"""
+    if len(result[2]) > limit:
+        result = None
+    flights.finish(key, flight, result)
+    if result is not None and on_result is not None:
+        on_result(*result)
+
+
+def tee(key, flight, chunks, headers, limit, on_result):
+    """yields chunks, as bytes, while copying them until they grow over
+    limit bytes; finishes flight with the body copied once they end, or
+    with None as soon as the copy is dropped or they fail"""
+    parts, size, done = [], 0, False
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if parts is not None:
+                size += len(chunk)
+                if size > limit:
+                    parts = None
+                    done = True
+                    flights.finish(key, flight, None)
+                else:
+                    parts.append(chunk)
+            yield chunk
+        if parts is not None:
+            done = True
+            publish(key, flight, (200, headers, b"".join(parts)), limit,
+                    on_result)
+    finally:
+        if not done:
+            flights.finish(key, flight, None)
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -5,6 +5,9 @@ RESTful API actions.
 """
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.paging import list_response, page_args
 from flask import abort, jsonify, request
 
 from models import storage
@@ -12,6 +15,8 @@ from models.state import State
 
 # Route to retrieve all the State objects
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
+@conditional(State)
+@cached(State)
 def retrieve_all_states():
     """
     Retrieve a list of all State objects.
@@ -19,10 +24,12 @@ def retrieve_all_states():
     Returns:
         A JSON response containing a list of all State objects.
     """
-    states = storage.all(State).values()
-
-    list_of_states = [state.to_dict() for state in states]
-    return jsonify(list_of_states)
+    limit, after = page_args()
+    if limit is not None:
+        states = storage.page(State, limit, after)
+    else:
+        states = storage.all(State).values()
+    return list_response(states, limit)
 
 # Route for retrieving a specific State object by ID
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
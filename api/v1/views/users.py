@@ -5,18 +5,25 @@ default RESTful API actions.
 """
 
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.paging import list_response, page_args
 from flask import abort, jsonify, request
 from models.user import User
 from models import storage
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
+@cached(User)
 def retrieve_all_users():
     """
     Gets/Retrieves the list of all User objects.
     """
-    users = storage.all(User).values()
-    return jsonify([user.to_dict() for user in users])
+    limit, after = page_args()
+    if limit is not None:
+        users = storage.page(User, limit, after)
+    else:
+        users = storage.all(User).values()
+    return list_response(users, limit)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Measures /api/v1/stats and /api/v1/states latency in file mode with a
+large number of objects in FileStorage.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_class_partitions [number_of_objects]
+"""
+
+import os
+import sys
+import tempfile
+from timeit import timeit
+
+from api.v1.app import app
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.review import Review
+from models.state import State
+
+
+def legacy_all(cls):
+    """the previous all(cls): a scan over every stored object"""
+    new_dict = {}
+    for key, value in storage.all().items():
+        if cls == value.__class__ or cls == value.__class__.__name__:
+            new_dict[key] = value
+    return new_dict
+
+
+def main():
+    """fills the storage then times the routes"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+
+    for i in range(50):
+        storage.new(State(name="state_{}".format(i)))
+    for i in range(total - 50):
+        storage.new(Review(text="review", place_id="p", user_id="u"))
+    print("objects in storage: {}".format(storage.count()))
+
+    client = app.test_client()
+    runs = 20
+    for route in ("/api/v1/stats", "/api/v1/states"):
+        assert client.get(route).status_code == 200
+        ms = timeit(lambda: client.get(route), number=runs) / runs * 1000
+        print("GET {:<16} {:10.3f} ms".format(route, ms))
+
+    ms = timeit(lambda: storage.all(State), number=runs) / runs * 1000
+    print("all(State)            {:10.3f} ms".format(ms))
+    ms = timeit(lambda: legacy_all(State), number=runs) / runs * 1000
+    print("full scan (previous)  {:10.3f} ms".format(ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""
+Measures, for every class, how many objects per second are hydrated
+from their stored dictionaries and serialized back with to_dict, with
+the class codecs and with the previous generic code.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_codecs [number_of_objects]
+"""
+
+import sys
+from timeit import timeit
+
+from models.base_model import time
+from models.engine.file_storage import classes
+
+
+def legacy_to_dict(obj):
+    """the previous to_dict: strftime on both datetimes"""
+    new_dict = obj.__dict__.copy()
+    if "created_at" in new_dict:
+        new_dict["created_at"] = new_dict["created_at"].strftime(time)
+    if "updated_at" in new_dict:
+        new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+    new_dict["__class__"] = obj.__class__.__name__
+    if "password" in new_dict:
+        del new_dict["password"]
+    return new_dict
+
+
+def rate(function, items):
+    """returns how many items per second function handles"""
+    seconds = timeit(lambda: [function(item) for item in items], number=3)
+    return 3 * len(items) / seconds
+
+
+def main():
+    """prints the throughputs of every class"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("{:<10} {:>14} {:>14} {:>14} {:>14}".format(
+        "class", "hydrate/s", "(previous)", "to_dict/s", "(previous)"))
+    for name, cls in sorted(classes.items()):
+        objs = [cls(name="obj_{}".format(i), text="x" * 20)
+                for i in range(total)]
+        stored = [obj.to_dict(save_fs=True) for obj in objs]
+        print("{:<10} {:>14,.0f} {:>14,.0f} {:>14,.0f} {:>14,.0f}".format(
+            name, rate(cls.from_storage, stored),
+            rate(lambda data: cls(**data), stored),
+            rate(lambda obj: obj.to_dict(), objs),
+            rate(legacy_to_dict, objs)))
+
+
+if __name__ == "__main__":
+    main()
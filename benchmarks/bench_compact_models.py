@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+Measures the memory held by reviews and places loaded the way
+FileStorage reloads them, with the compact slotted classes and with
+classes keeping everything in __dict__ like they did before, and how
+many objects per second are loaded and serialized back with to_dict.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_compact_models [number_of_reviews]
+"""
+
+import json
+import sys
+from timeit import timeit
+import tracemalloc
+import uuid
+
+from models.base_model import BaseModel
+from models.place import Place
+from models.review import Review
+
+
+class DictReview(BaseModel):
+    """Review as it was, with class defaults and a __dict__"""
+    place_id = ""
+    user_id = ""
+    text = ""
+
+
+class DictPlace(BaseModel):
+    """Place as it was, with class defaults and a __dict__"""
+    city_id = ""
+    user_id = ""
+    name = ""
+    description = ""
+    number_rooms = 0
+    number_bathrooms = 0
+    max_guest = 0
+    price_by_night = 0
+    latitude = 0.0
+    longitude = 0.0
+    amenity_ids = []
+
+
+def records(total):
+    """returns the stored dictionaries of total reviews spread over
+    total / 50 places, and of those places, decoded from JSON so that
+    every id is its own string like after a reload"""
+    users = [str(uuid.uuid4()) for i in range(max(total // 100, 1))]
+    cities = [str(uuid.uuid4()) for i in range(max(total // 5000, 1))]
+    places = [Place(name="place {}".format(i), city_id=cities[i % len(cities)],
+                    user_id=users[i % len(users)], description="x" * 80,
+                    number_rooms=2, latitude=37.77, longitude=-122.41)
+              for i in range(max(total // 50, 1))]
+    reviews = [Review(place_id=places[i % len(places)].id,
+                      user_id=users[i % len(users)],
+                      text="review {} ".format(i) * 4)
+               for i in range(total)]
+    return (json.loads(json.dumps([obj.to_dict(save_fs=True)
+                                   for obj in reviews])),
+            json.loads(json.dumps([obj.to_dict(save_fs=True)
+                                   for obj in places])))
+
+
+def held(cls, data):
+    """returns the bytes held by the objects of cls loaded from data"""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objs = [cls.from_storage(value) for value in data]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objs
+    return size
+
+
+def rate(function, count):
+    """returns how many objects per second function handles"""
+    return 3 * count / timeit(function, number=3)
+
+
+def main():
+    """prints the memory and throughputs of both representations"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    reviews, places = records(total)
+    print("reviews: {}  places: {}".format(len(reviews), len(places)))
+    print("{:<12} {:>10} {:>12} {:>12}".format("class", "bytes/obj",
+                                               "load/s", "to_dict/s"))
+    for cls, data in ((DictReview, reviews), (Review, reviews),
+                      (DictPlace, places), (Place, places)):
+        objs = [cls.from_storage(value) for value in data]
+        print("{:<12} {:10.0f} {:12,.0f} {:12,.0f}".format(
+            cls.__name__, held(cls, data) / len(data),
+            rate(lambda: [cls.from_storage(value) for value in data],
+                 len(data)),
+            rate(lambda: [obj.to_dict() for obj in objs], len(objs))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Measures the memory a process holds after reading every review, and how
+fast random reviews are read, from FileStorage, which loads them all,
+and from DBMStorage, which keeps a bounded working set.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_dbm_storage [number_of_reviews] [cache_bytes]
+"""
+
+import dbm
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models.engine.dbm_storage import DBMStorage
+from models.engine.file_storage import FileStorage
+from models.review import Review
+
+
+def measure(name, storage, ids):
+    """reloads storage, reads every review then random ones, and prints
+    the memory held and the reads per second"""
+    tracemalloc.start()
+    storage.reload()
+    for id in ids:
+        storage.get(Review, id)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    sample = random.choices(ids, k=100000)
+    start = time.perf_counter()
+    for id in sample:
+        storage.get(Review, id)
+    rate = len(sample) / (time.perf_counter() - start)
+    print("{:<12} held {:8.1f} MiB  random get/s {:12,.0f}"
+          .format(name, held / 2 ** 20, rate))
+
+
+def main():
+    """writes the reviews to both storages then measures them"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 4 * 1024 * 1024
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    files = FileStorage()
+    dbms = DBMStorage()
+    dbms._DBMStorage__path = os.path.join(tmp, "hbnb")
+    dbms._DBMStorage__budget = budget
+    dbms.reload()
+    reviews = [Review(place_id="p", user_id="u",
+                      text="review {} ".format(i) * 8) for i in range(total)]
+    for review in reviews:
+        files.new(review)
+        dbms.new(review)
+    files.save()
+    dbms.save()
+    ids = [review.id for review in reviews]
+    del reviews
+    # forget the objects so that reload reads the file again
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__marker = None
+    print("reviews: {}  cache budget: {} bytes  dbm: {}".format(
+        total, budget, dbm.whichdb(dbms._DBMStorage__path)))
+    measure("FileStorage", files, ids)
+    measure("DBMStorage", dbms, ids)
+
+
+if __name__ == "__main__":
+    main()
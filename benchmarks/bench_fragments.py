@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""
+Measures building the JSON list of every place from the JSON text each
+object caches, cold and warm, against serializing their dictionaries.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_fragments [number_of_places]
+"""
+
+import json
+import sys
+import time
+
+from api.v1.views.paging import stream_list
+from models.base_model import fragments
+from models.place import Place
+
+
+def dumped(places):
+    """serializes the dictionaries of places, like the views did"""
+    return json.dumps([place.to_dict() for place in places],
+                      sort_keys=True, separators=(",", ":"))
+
+
+def joined(places):
+    """joins the cached JSON text of places"""
+    return "".join(stream_list(places))
+
+
+def measure(name, function, places):
+    """prints the seconds function takes on places"""
+    start = time.perf_counter()
+    function(places)
+    print("{:<8} {:9.3f} ms".format(name,
+                                    (time.perf_counter() - start) * 1000))
+
+
+def main():
+    """builds the places then measures every way"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    places = [Place(name="place_{}".format(i), city_id="c", user_id="u",
+                    description="x" * 100) for i in range(total)]
+    print("places: {}".format(total))
+    measure("dumps", dumped, places)
+    fragments.clear()
+    measure("cold", joined, places)
+    measure("warm", joined, places)
+
+
+if __name__ == "__main__":
+    main()
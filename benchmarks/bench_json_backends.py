@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Measures, for every JSON backend installed, how many places and reviews
+per second are written the way FileStorage saves them (datetimes left to
+the backend), read back the way it reloads them, and written as the
+sorted-key text of the API.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_json_backends [number_of_objects]
+"""
+
+import sys
+from timeit import timeit
+
+from models.base_model import codec
+from models.engine.json_backend import backends
+from models.place import Place
+from models.review import Review
+
+
+def rate(function, count):
+    """returns how many objects per second function handles"""
+    return 3 * count / timeit(function, number=3)
+
+
+def main():
+    """builds places and reviews then prints the throughputs of every
+    backend"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    objs = [Place(name="place_{}".format(i), city_id="c" * 36,
+                  user_id="u" * 36, description="x" * 100, number_rooms=3,
+                  latitude=37.77, amenity_ids=["a" * 36] * 3)
+            for i in range(total // 2)]
+    objs += [Review(text="review {} ".format(i) * 8, place_id="p" * 36,
+                    user_id="u" * 36) for i in range(total - len(objs))]
+    records = {type(obj).__name__ + "." + obj.id:
+               codec(type(obj)).to_dict(obj, True, True) for obj in objs}
+    dicts = [obj.to_dict() for obj in objs]
+    print("objects: {}".format(total))
+    print("{:<8} {:>14} {:>14} {:>14}".format("backend", "save/s",
+                                              "reload/s", "api/s"))
+    for name, (dumps, loads) in backends.items():
+        text = dumps(records).encode()
+        print("{:<8} {:14,.0f} {:14,.0f} {:14,.0f}".format(
+            name,
+            rate(lambda: [dumps(key) + ": " + dumps(value)
+                          for key, value in records.items()], total),
+            rate(lambda: loads(text), total),
+            rate(lambda: [dumps(value, True) for value in dicts], total)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Measures POST /api/v1/places_search latency in file mode with a large
+number of places in FileStorage.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_places_search [number_of_places]
+"""
+
+import json
+import os
+import sys
+import tempfile
+from timeit import timeit
+
+from api.v1.app import app
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+
+
+def main():
+    """fills the storage then times a few searches"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+
+    states = [State(name="state_{}".format(i)) for i in range(50)]
+    cities = [City(name="city_{}".format(i), state_id=states[i % 50].id)
+              for i in range(1000)]
+    amenities = [Amenity(name="amenity_{}".format(i)) for i in range(20)]
+    for obj in states + cities + amenities:
+        storage.new(obj)
+    for i in range(total):
+        # amenity i of every place is taken with odds 1 / (i + 1)
+        ids = [a.id for n, a in enumerate(amenities) if i % (n + 1) == 0]
+        storage.new(Place(name="place", city_id=cities[i % 1000].id,
+                          user_id="u", amenity_ids=ids))
+    print("places in storage: {}".format(storage.count(Place)))
+
+    client = app.test_client()
+    runs = 20
+    searches = {
+        "one state": {"states": [states[0].id]},
+        "one city": {"cities": [cities[1].id]},
+        "state+amenities": {"states": [states[0].id],
+                            "amenities": [a.id for a in amenities[:3]]},
+        "rare amenities": {"amenities": [a.id for a in amenities[15:]]},
+    }
+    for name, body in searches.items():
+        def post(body=json.dumps(body)):
+            """posts the search"""
+            return client.post("/api/v1/places_search", data=body,
+                               content_type="application/json")
+        found = len(post().get_json())
+        ms = timeit(post, number=runs) / runs * 1000
+        print("{:<16} {:8} places, route {:10.3f} ms".format(
+            name, found, ms))
+        ms = timeit(lambda: storage.search_places(**body),
+                    number=runs) / runs * 1000
+        print("{:<16} {:8}  search_places {:10.3f} ms".format("", "", ms))
+
+
+if __name__ == "__main__":
+    main()
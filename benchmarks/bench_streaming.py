@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Measures time to first byte, total time and peak memory of POST
+/api/v1/places_search with an empty body (every place), streamed,
+against building the whole list with jsonify.
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_streaming [number_of_places]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from api.v1.app import app
+from flask import jsonify
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def streamed(client):
+    """posts the search, returns the seconds to the first chunk"""
+    start = time.perf_counter()
+    response = client.post("/api/v1/places_search", json={},
+                           buffered=False)
+    first = None
+    for chunk in response.response:
+        if first is None:
+            first = time.perf_counter() - start
+    response.close()
+    return first
+
+
+def legacy(client):
+    """builds the full list then the full string, like the view did"""
+    with app.test_request_context():
+        start = time.perf_counter()
+        places = storage.all(Place).values()
+        jsonify([place.to_dict() for place in places]).get_data()
+        return time.perf_counter() - start
+
+
+def measure(name, function, client):
+    """prints the time to first byte, total time and peak memory; the
+    memory is traced in a second run, not to slow down the first"""
+    start = time.perf_counter()
+    first = function(client)
+    total = time.perf_counter() - start
+    tracemalloc.start()
+    function(client)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("{:<10} first byte {:9.3f} ms  total {:9.3f} ms  peak {:8.1f} MiB"
+          .format(name, first * 1000, total * 1000, peak / 2 ** 20))
+
+
+def main():
+    """fills the storage then measures both ways"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    for i in range(total):
+        storage.new(Place(name="place_{}".format(i), city_id="c",
+                          user_id="u", description="x" * 100))
+    print("places in storage: {}".format(storage.count(Place)))
+    client = app.test_client()
+    measure("jsonify", legacy, client)
+    measure("streamed", streamed, client)
+
+
+if __name__ == "__main__":
+    main()
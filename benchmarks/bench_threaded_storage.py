@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage read throughput from many threads while another
+thread keeps saving, with saves serialized outside of the lock (the
+FileStorage behaviour) and with saves holding the write lock for their
+whole duration (a single storage mutex).
+
+usage, from the repository root:
+    python3 -m benchmarks.bench_threaded_storage [objects] [readers] [seconds]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+
+
+def run(readers, seconds, exclusive):
+    """returns (reads, saves) done in seconds"""
+    lock = storage._FileStorage__lock
+    places = list(storage.all(Place).values())
+    stop = time.monotonic() + seconds
+    reads = [0] * readers
+    saves = [0]
+
+    def reader(n):
+        """gets places and their reviews"""
+        i = 0
+        while time.monotonic() < stop:
+            place = storage.get(Place, places[i % len(places)].id)
+            place.reviews
+            storage.count(Review)
+            reads[n] += 1
+            i += 1
+
+    def writer():
+        """adds a review then saves"""
+        while time.monotonic() < stop:
+            storage.new(Review(text="new", place_id=places[0].id))
+            if exclusive:
+                with lock.writing():
+                    storage.save()
+            else:
+                storage.save()
+            saves[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(n,))
+               for n in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(reads), saves[0]
+
+
+def main():
+    """fills the storage then runs both variants"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    for i in range(total // 10):
+        place = Place(name="place", city_id="c", user_id="u")
+        storage.new(place)
+        for j in range(9):
+            storage.new(Review(text="text", place_id=place.id))
+    storage.save()
+
+    for name, exclusive in (("serialize outside lock", False),
+                            ("save holds write lock", True)):
+        reads, saves = run(readers, seconds, exclusive)
+        print("{:<24} {:10.0f} reads/s {:6.1f} saves/s".format(
+            name, reads / seconds, saves / seconds))
+
+
+if __name__ == "__main__":
+    main()
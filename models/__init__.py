@@ -11,6 +11,12 @@ storage_t = getenv("HBNB_TYPE_STORAGE")
 if storage_t == "db":
     from models.engine.db_storage import DBStorage
     storage = DBStorage()
+elif storage_t == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+elif storage_t == "dbm":
+    from models.engine.dbm_storage import DBMStorage
+    storage = DBMStorage()
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
@@ -3,16 +3,24 @@
 Contains class BaseModel
 """
 
+from collections import OrderedDict
 from datetime import datetime
 import models
+from models.engine import json_backend
 from os import getenv
 import sqlalchemy
+from sys import intern
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
+import threading
 import uuid
 import hashlib
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# attributes stored as datetimes, serialized in the time format
+dates = ("created_at", "updated_at")
+# value of a slot that was never set
+unset = object()
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -20,6 +28,283 @@ else:
     Base = object
 
 
+class Field:
+    """an attribute declared by a compact model, kept in the slot of the
+    same name prefixed with an underscore; it reads as default while it
+    is not set, on the instances as on the class"""
+
+    def __init__(self, default=None):
+        """creates a Field whose value is default until set"""
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        """finds the slot of the field, once owner is created"""
+        self.slot = owner.__dict__["_" + name]
+
+    def __get__(self, obj, owner=None):
+        """returns the value of the field of obj"""
+        if obj is None:
+            return self.default
+        return self.load(getattr(obj, self.slot.__name__, self.default))
+
+    def __set__(self, obj, value):
+        """sets the value of the field of obj"""
+        self.slot.__set__(obj, self.store(value))
+
+    def __delete__(self, obj):
+        """unsets the field of obj"""
+        self.slot.__delete__(obj)
+
+    @staticmethod
+    def store(value):
+        """returns what the slot keeps for value"""
+        return value
+
+    @staticmethod
+    def load(value):
+        """returns the value kept in the slot as value"""
+        return value
+
+    def setter(self):
+        """returns the function setting the field of an object from its
+        stored value"""
+        return self.slot.__set__
+
+
+class Key(Field):
+    """a Field holding an id, interned so that the objects linked to the
+    same object share one string"""
+
+    @staticmethod
+    def store(value):
+        """returns the interned value"""
+        return intern(value) if type(value) is str else value
+
+    def setter(self):
+        """returns the function setting the field of an object from its
+        stored value"""
+        set_slot = self.slot.__set__
+
+        def set_key(obj, value):
+            """sets the interned id value"""
+            set_slot(obj, intern(value) if type(value) is str else value)
+        return set_key
+
+
+class Timestamp(Field):
+    """a Field holding a datetime, parsed from its stored ISO 8601 text
+    by the C parser when loaded"""
+
+    def setter(self):
+        """returns the function setting the field of an object from its
+        stored value"""
+        set_slot = self.slot.__set__
+        parse = datetime.fromisoformat
+
+        def set_timestamp(obj, value):
+            """sets the datetime of value, in ISO 8601 if a string"""
+            set_slot(obj, parse(value) if type(value) is str else value)
+        return set_timestamp
+
+
+class Codec:
+    """converts the instances of one class to and from dictionaries
+
+    Everything that depends on the class only is worked out once, when
+    the codec is built; datetimes go through the C ISO 8601 parser and
+    formatter, which give the same text as the time format. The Fields
+    of compact models are read and written straight from their slots.
+    """
+
+    def __init__(self, cls):
+        """builds the codec of cls"""
+        self.cls = cls
+        self.name = cls.__name__
+        self.relationships = ()
+        mapper = None
+        if models.storage_t == "db":
+            # BaseModel itself is not mapped and has no relationships
+            mapper = sqlalchemy.inspect(cls, raiseerr=False)
+        if mapper is not None:
+            # relationships loaded on the instance are not attributes
+            self.relationships = tuple(mapper.relationships.keys())
+        # name: Field of a compact model, in the order they are declared
+        self.fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Field):
+                    self.fields[name] = value
+        # (name, slot) of every Field, names of the Timestamps and
+        # name: function setting the Field from its stored value
+        self.slots = tuple((name, field.slot.__name__)
+                           for name, field in self.fields.items())
+        self.stamps = tuple(name for name, field in self.fields.items()
+                            if isinstance(field, Timestamp))
+        self.setters = {name: field.setter()
+                        for name, field in self.fields.items()}
+
+    def from_storage(self, data):
+        """returns the instance stored as the dictionary data, without
+        running __init__"""
+        obj = self.cls.__new__(self.cls)
+        if self.fields:
+            return self.__fill(obj, data)
+        attrs = obj.__dict__
+        attrs.update(data)
+        attrs.pop("__class__", None)
+        for name in dates:
+            value = attrs.get(name)
+            if type(value) is str:
+                attrs[name] = datetime.fromisoformat(value)
+        return obj
+
+    def __fill(self, obj, data):
+        """sets the slots of the compact model obj from data, and its
+        __dict__ only if data has other attributes"""
+        setters = self.setters
+        for name, value in data.items():
+            setter = setters.get(name)
+            if setter is not None:
+                setter(obj, value)
+            elif name != "__class__":
+                obj.__dict__[name] = value
+                object.__setattr__(obj, "_extra", True)
+        return obj
+
+    def __slots_of(self, obj):
+        """returns the dictionary of the Fields set on the compact model
+        obj, with the timestamps left as they are kept"""
+        attrs = {}
+        for name, slot in self.slots:
+            value = getattr(obj, slot, unset)
+            if value is not unset:
+                attrs[name] = value
+        return attrs
+
+    def attributes(self, obj):
+        """returns the dictionary of the attributes set on obj, which is
+        obj.__dict__ unless obj is a compact model"""
+        if not self.fields:
+            return obj.__dict__
+        attrs = self.__slots_of(obj)
+        if getattr(obj, "_extra", False):
+            attrs.update(obj.__dict__)
+        return attrs
+
+    def to_dict(self, obj, save_fs=None, native=False):
+        """returns the dictionary of obj, without its password unless
+        save_fs is given; native leaves the datetimes for the JSON
+        backend to write"""
+        if self.fields:
+            new_dict = self.__slots_of(obj)
+            for name in () if native else self.stamps:
+                value = new_dict.get(name)
+                if type(value) is datetime:
+                    new_dict[name] = value.isoformat(timespec="microseconds")
+            if getattr(obj, "_extra", False):
+                new_dict.update(obj.__dict__)
+        else:
+            new_dict = obj.__dict__.copy()
+            for name in () if native else dates:
+                value = new_dict.get(name)
+                if value is not None:
+                    new_dict[name] = value.isoformat(timespec="microseconds")
+        new_dict["__class__"] = self.name
+        if "_sa_instance_state" in new_dict:
+            del new_dict["_sa_instance_state"]
+            for name in self.relationships:
+                new_dict.pop(name, None)
+        if save_fs is None:
+            new_dict.pop("password", None)
+        return new_dict
+
+
+class Fragments:
+    """the JSON texts cached by to_json, by <class name>.<id>, bounded by
+    their total length; the least recently used go first"""
+
+    def __init__(self, max_bytes):
+        """creates an empty cache of at most max_bytes characters"""
+        self.max_bytes = max_bytes
+        self.__texts = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """returns the number of texts cached"""
+        return len(self.__texts)
+
+    def __contains__(self, key):
+        """tells whether a text is cached for key"""
+        return key in self.__texts
+
+    def get(self, key, updated_at):
+        """returns the text cached for key at updated_at, or None"""
+        with self.__lock:
+            entry = self.__texts.get(key)
+            if entry is None or entry[0] != updated_at:
+                return None
+            self.__texts.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, updated_at, text):
+        """caches text for key at updated_at, dropping the least recently
+        used texts over the bound"""
+        if len(text) > self.max_bytes:
+            return
+        with self.__lock:
+            self.__drop(key)
+            self.__texts[key] = (updated_at, text)
+            self.__bytes += len(text)
+            while self.__bytes > self.max_bytes:
+                self.__bytes -= len(self.__texts.popitem(last=False)[1][1])
+
+    def pop(self, key):
+        """drops the text cached for key, if any"""
+        with self.__lock:
+            self.__drop(key)
+
+    def __drop(self, key):
+        """drops the text of key; the caller holds the lock"""
+        entry = self.__texts.pop(key, None)
+        if entry is not None:
+            self.__bytes -= len(entry[1])
+
+    def clear(self):
+        """drops every text"""
+        with self.__lock:
+            self.__texts.clear()
+            self.__bytes = 0
+
+    def size(self):
+        """returns the total length of the texts cached"""
+        return self.__bytes
+
+
+codecs = {}
+# JSON text of to_dict() of the objects serialized by to_json, dropped
+# when an attribute is set
+fragments = Fragments(int(getenv("HBNB_JSON_FRAGMENT_BYTES",
+                                 256 * 1024 * 1024)))
+
+
+def codec(cls):
+    """returns the Codec of cls, built on first use"""
+    try:
+        return codecs[cls]
+    except KeyError:
+        return codecs.setdefault(cls, Codec(cls))
+
+
+def forget_json(obj):
+    """drops the JSON text cached by obj.to_json()"""
+    if models.storage_t == "db":
+        id = obj.__dict__.get("id")
+    else:
+        id = getattr(obj, "id", None)
+    fragments.pop(obj.__class__.__name__ + "." + str(id))
+
+
 class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
@@ -48,10 +333,25 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute, drops the cached JSON text of the object
+            and lets the storage update its indexes"""
+            old = getattr(self, name, None)
+            super().__setattr__(name, value)
+            forget_json(self)
+            models.storage.track(self, name, old)
+    else:
+        def __setattr__(self, name, value):
+            """sets an attribute and drops the cached JSON text of the
+            object"""
+            super().__setattr__(name, value)
+            forget_json(self)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
-                                         self.__dict__)
+                                         codec(type(self)).attributes(self))
 
     def save(self):
         """updates the attribute 'updated_at' with the current datetime"""
@@ -59,24 +359,50 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
+    @classmethod
+    def from_storage(cls, data):
+        """returns the instance stored as the dictionary data, as
+        to_dict(save_fs=True) returned it"""
+        return codec(cls).from_storage(data)
+
     def to_dict(self, save_fs=None):
         """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
-        new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
+        return codec(type(self)).to_dict(self, save_fs)
 
-        """Remove 'password' from the dictionary if
-        save_fs is None and it exists."""
-        if save_fs is None:
-            if "password" in new_dict:
-                del new_dict["password"]
-        return new_dict
+    def to_json(self):
+        """returns the JSON text of to_dict(), with sorted keys, cached until
+        an attribute is set or updated_at changes"""
+        key = self.__class__.__name__ + "." + str(self.id)
+        updated_at = self.updated_at
+        text = fragments.get(key, updated_at)
+        if text is None:
+            text = json_backend.dumps(self.to_dict(), sort_keys=True)
+            fragments.put(key, updated_at, text)
+        return text
 
     def delete(self):
         """delete the current instance from the storage"""
         models.storage.delete(self)
+
+
+if models.storage_t == "db":
+    CompactModel = BaseModel
+else:
+    class CompactModel(BaseModel):
+        """a BaseModel keeping id, the datetimes and the Fields declared
+        by its subclasses in slots instead of its __dict__
+
+        Subclasses declare each Field with a slot of the same name
+        prefixed with an underscore; attributes that are not Fields still
+        go to __dict__, which is only read once _extra is set.
+        """
+        __slots__ = ("_id", "_created_at", "_updated_at", "_extra")
+        id = Field()
+        created_at = Timestamp()
+        updated_at = Timestamp()
+
+        def __setattr__(self, name, value):
+            """sets an attribute, noting when it goes to __dict__"""
+            if name not in codec(type(self)).fields:
+                object.__setattr__(self, "_extra", True)
+            super().__setattr__(name, value)
@@ -22,3 +22,10 @@ class City(BaseModel, Base):
     def __init__(self, *args, **kwargs):
         """initializes city"""
         super().__init__(*args, **kwargs)
+
+    if models.storage_t != "db":
+        @property
+        def places(self):
+            """getter for list of place instances related to the city"""
+            from models.place import Place
+            return models.storage.related(Place, "city_id", self.id)
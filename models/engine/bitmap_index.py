@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the BitmapIndex class
+"""
+
+import re
+
+# a byte of a bitmap with at least one bit set
+nonzero = re.compile(b"[^\x00]")
+
+
+class BitmapIndex:
+    """an index of the labels of keys, such as the amenities of places
+
+    Every key gets a row number and every label a bit position. Each key
+    keeps the mask of the bits of its labels, and each label a bitmap of
+    the rows of its keys, so "has all of these labels" is a bitwise AND.
+    """
+
+    def __init__(self):
+        """creates an empty BitmapIndex"""
+        # key: row number, and row number: key (None for a free row)
+        self.__rows = {}
+        self.__keys = []
+        self.__free = []
+        # label: bit position, and bit position: label
+        self.__bits = {}
+        self.__labels = []
+        # key: mask of the bits of its labels
+        self.__masks = {}
+        # label: bitmap of the rows of its keys, bit i of byte j is row
+        # 8 * j + i
+        self.__postings = {}
+
+    def __len__(self):
+        """returns the number of keys with at least one label"""
+        return len(self.__masks)
+
+    def add(self, key, labels):
+        """sets the labels of key, replacing its previous ones"""
+        self.remove(key)
+        labels = set(labels or ())
+        if not labels:
+            return
+        if self.__free:
+            row = self.__free.pop()
+            self.__keys[row] = key
+        else:
+            row = len(self.__keys)
+            self.__keys.append(key)
+        self.__rows[key] = row
+        mask = 0
+        for label in labels:
+            bit = self.__bits.get(label)
+            if bit is None:
+                bit = self.__bits[label] = len(self.__labels)
+                self.__labels.append(label)
+                self.__postings[label] = bytearray()
+            mask |= 1 << bit
+            posting = self.__postings[label]
+            if len(posting) <= row >> 3:
+                posting.extend(bytes((row >> 3) + 1 - len(posting)))
+            posting[row >> 3] |= 1 << (row & 7)
+        self.__masks[key] = mask
+
+    def remove(self, key):
+        """forgets the labels of key"""
+        mask = self.__masks.pop(key, 0)
+        if not mask:
+            return
+        row = self.__rows.pop(key)
+        for label in self.__labels_of(mask):
+            self.__postings[label][row >> 3] &= ~(1 << (row & 7)) & 0xff
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def __labels_of(self, mask):
+        """returns the labels of the bits set in mask"""
+        return [self.__labels[bit] for bit in range(mask.bit_length())
+                if mask >> bit & 1]
+
+    def labels(self, key):
+        """returns the labels of key"""
+        return self.__labels_of(self.__masks.get(key, 0))
+
+    def mask(self, labels):
+        """returns the mask of the bits of labels, or None if a label
+        was never seen"""
+        mask = 0
+        for label in labels:
+            bit = self.__bits.get(label)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def having_all(self, labels, keys=None):
+        """returns the keys, among keys if given, that have every one of
+        labels
+
+        Given keys are checked against the mask of labels; otherwise the
+        bitmaps of labels are ANDed and the rows left are read back.
+        """
+        labels = set(labels)
+        mask = self.mask(labels)
+        if mask is None:
+            return []
+        if keys is not None:
+            masks = self.__masks
+            return [key for key in keys if masks.get(key, 0) & mask == mask]
+        if not labels:
+            return list(self.__masks)
+        postings = sorted((self.__postings[label] for label in labels),
+                          key=len)
+        bitmap = int.from_bytes(postings[0], "little")
+        for posting in postings[1:]:
+            if not bitmap:
+                break
+            bitmap &= int.from_bytes(posting, "little")
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        found = []
+        for match in nonzero.finditer(data):
+            first = match.start() << 3
+            byte = data[match.start()]
+            for bit in range(8):
+                if byte >> bit & 1:
+                    found.append(self.__keys[first + bit])
+        return found
@@ -3,6 +3,7 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
@@ -13,11 +14,33 @@ from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import BigInteger, Column, DateTime, String, Table
+from sqlalchemy import create_engine, event, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import scoped_session, selectinload, sessionmaker
+import uuid
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# number of changes and time of the last change of the objects of every
+# class, bumped by save(); the row named '' holds the generation of the
+# database instead, so that tags differ once the tables are created again
+if models.storage_t == "db":
+    versions = Table('versions', Base.metadata,
+                     Column('name', String(60), primary_key=True),
+                     Column('changes', BigInteger, nullable=False),
+                     Column('time', DateTime))
+
+
+def note_changes(session, flush_context, instances):
+    """notes the classes of the objects a flush stores, updates or
+    deletes, for save() to count their changes"""
+    changed = session.info.setdefault('hbnb.changed', set())
+    for obj in session.new | session.deleted:
+        changed.add(type(obj).__name__)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            changed.add(type(obj).__name__)
 
 
 class DBStorage:
@@ -40,12 +63,38 @@ class DBStorage:
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def __options(self, cls, load):
+        """returns the loader options that load the relationship paths
+        of load (like "cities" or "cities.places") up front, one SELECT
+        ... IN query per relationship instead of one query per object"""
+        options = []
+        for path in load or ():
+            owner = cls
+            option = None
+            for name in path.split("."):
+                attr = getattr(owner, name)
+                if option is None:
+                    option = selectinload(attr)
+                else:
+                    option = option.selectinload(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def all(self, cls=None, load=None):
+        """query on the current database session, loading the
+        relationship paths in load along with the objects"""
         new_dict = {}
+        if cls is not None:
+            cls = self.__class(cls)
+            if cls is None:
+                return new_dict
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+            if cls is None or cls is classes[clss]:
+                query = self.__session.query(classes[clss])
+                if cls is not None:
+                    query = query.options(*self.__options(cls, load))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -56,8 +105,17 @@ class DBStorage:
         self.__session.add(obj)
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """commit all changes of the current database session, counting
+        a change of their classes in the same transaction"""
+        session = self.__session
+        session.flush()
+        names = session.info.pop('hbnb.changed', set()) & set(classes)
+        if names:
+            session.execute(versions.update()
+                            .where(versions.c.name.in_(names))
+                            .values(changes=versions.c.changes + 1,
+                                    time=datetime.utcnow()))
+        session.commit()
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
@@ -67,7 +125,21 @@ class DBStorage:
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
+        try:
+            with self.__engine.begin() as conn:
+                found = set(conn.execute(select(versions.c.name)).scalars())
+                rows = [{"name": name, "changes": 0} for name in classes
+                        if name not in found]
+                if "" not in found:
+                    rows.append({"name": "",
+                                 "changes": uuid.uuid4().int >> 97})
+                if rows:
+                    conn.execute(versions.insert(), rows)
+        except IntegrityError:
+            # another process inserted them first
+            pass
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "before_flush", note_changes)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -75,33 +147,143 @@ class DBStorage:
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
+    def __class(self, cls):
+        """returns the mapped class for cls, a class or a class name"""
+        if type(cls) is str:
+            return classes.get(cls)
+        return cls if cls in classes.values() else None
+
     def get(self, cls, id):
         """A method used to get/retrieve an object from
         the storage by using the class and id.
         """
+        cls = self.__class(cls)
+        if cls is None or not id or type(id) is not str:
+            return None
+        # primary key lookup, answered by the identity map when loaded
+        return self.__session.get(cls, id)
 
-        if cls in classes.values() and id and type(id) == str:
-            objs = self.all(cls)
-
-            for key, value in objs.items():
-
-                if key.split(".")[1] == id:
-
-                    return value
-
-        return None
-
+    def get_many(self, cls, ids, load=None):
+        """returns the objects of class cls found for the given ids,
+        in the order of ids, with a single IN query, loading the
+        relationship paths in load along with them
+        """
+        cls = self.__class(cls)
+        ids = [id for id in ids if id and type(id) is str]
+        if cls is None or not ids:
+            return []
+        objs = self.__session.query(cls).filter(cls.id.in_(ids)) \
+            .options(*self.__options(cls, load)).all()
+        by_id = {obj.id: obj for obj in objs}
+        return [by_id[id] for id in ids if id in by_id]
 
     def count(self, cls=None):
         """A method used to count the number of objects in
         storage that matches the given class.
         """
+        if cls is None:
+            return sum(self.counts().values())
+        cls = self.__class(cls)
+        if cls is None:
+            return 0
+        return self.__session.query(func.count(cls.id)).scalar()
+
+    def counts(self):
+        """returns the number of objects of every class, by class name,
+        with a single query
+        """
+        names = list(classes)
+        row = self.__session.query(
+            *[select(func.count(classes[name].id)).scalar_subquery()
+              for name in names]).one()
+        return dict(zip(names, row))
+
+    def version(self, cls=None):
+        """returns (tag, time) for the objects of class cls, or all
+        objects if cls is None: tag changes whenever one of them is
+        stored, updated or deleted, time is the datetime of the last
+        change, None if there was none; both come from the change
+        counters that save() bumps, read by primary key
+        """
+        if cls is None:
+            names = list(classes)
+        else:
+            cls = self.__class(cls)
+            if cls is None:
+                return "0", None
+            names = [cls.__name__]
+        rows = self.__session.execute(
+            select(versions.c.name, versions.c.changes, versions.c.time)
+            .where(versions.c.name.in_(names + [""])))
+        generation, changes, latest = 0, 0, None
+        for name, count, when in rows:
+            if name == "":
+                generation = count
+                continue
+            changes += count
+            if when is not None and (latest is None or when > latest):
+                latest = when
+        return "{:x}-{}".format(generation, changes), latest
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of class cls in the order of
+        their ids, starting after the id after; with attr, only those
+        whose attribute attr equals value
+        """
+        cls = self.__class(cls)
+        if cls is None:
+            return []
+        query = self.__session.query(cls)
+        if attr is not None:
+            query = query.filter(getattr(cls, attr) == value)
+        return self.__keyset(query, cls, after, limit)
 
-        objs = self.all(cls)
+    @staticmethod
+    def __keyset(query, cls, after, limit):
+        """returns the page of query after the id after, with LIMIT"""
+        if after is not None:
+            query = query.filter(cls.id > after)
+        return query.order_by(cls.id).limit(limit).all()
 
-        if cls in classes.values():
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after=None, limit=None, ids_only=False):
+        """returns the places in the given states or cities (all places
+        if there are neither) that have all the given amenities, with a
+        single query; with limit, only the page of page(Place, limit,
+        after); with ids_only, only their ids, without loading them
+        """
+        query = self.__session.query(Place.id if ids_only else Place)
+        if states or cities:
+            query = query.join(City, City.id == Place.city_id).filter(
+                or_(City.state_id.in_(states or []),
+                    City.id.in_(cities or [])))
+        if amenities:
+            amenities = set(amenities)
+            links = Base.metadata.tables['place_amenity']
+            with_all = select(links.c.place_id) \
+                .where(links.c.amenity_id.in_(amenities)) \
+                .group_by(links.c.place_id) \
+                .having(func.count(links.c.amenity_id) == len(amenities))
+            query = query.filter(Place.id.in_(with_all))
+        if limit is not None:
+            found = self.__keyset(query, Place, after, limit)
+        else:
+            found = query.all()
+        return [row.id for row in found] if ids_only else found
 
-            objs = self.all(cls)
-        count = len(objs)
+    def link_amenity(self, place, amenity):
+        """links amenity to place, returns False if it already was"""
+        if amenity in place.amenities:
+            return False
+        place.amenities.append(amenity)
+        place.updated_at = datetime.utcnow()
+        return True
 
-        return count
+    def unlink_amenity(self, place, amenity):
+        """unlinks amenity from place, returns False if it was not
+        linked"""
+        if amenity not in place.amenities:
+            return False
+        place.amenities.remove(amenity)
+        place.updated_at = datetime.utcnow()
+        return True
@@ -0,0 +1,615 @@
+#!/usr/bin/python3
+"""
+Contains the class DBMStorage
+"""
+
+import atexit
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+import dbm
+from heapq import nsmallest
+import models
+from models.amenity import Amenity
+from models.base_model import BaseModel, codec
+from models.city import City
+from models.engine.json_backend import dumps, loads
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import os
+from os import getenv
+import threading
+import time
+import uuid
+
+classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
+           "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign keys with an index record per value: <class name>: (names)
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+# lists of ids with an index record per id they hold: <class name>: (names)
+link_keys = {"Place": ("amenity_ids",)}
+# key of the record of the number of objects and changes of every class;
+# its entry '' holds the generation of the database instead, so that tags
+# differ once the database is created again
+versions_key = "#versions"
+# key of the record of the size of the database after its last compaction
+compacted_key = "#compacted"
+# number of delta records an index record takes before they are folded
+# into it, or more for a large index record: as many as would take its
+# size, a delta taking a block of DELTA_BYTES bytes in dbm.dumb
+FOLD_DELTAS = 32
+DELTA_BYTES = 512
+# number of index records whose number of deltas is remembered
+SLOTS = 4096
+# size under which the database is never compacted
+COMPACT_FLOOR = 1024 * 1024
+
+
+class Records(Mapping):
+    """the objects of some classes, by key, read from the database as
+    they are iterated over instead of all at once"""
+
+    def __init__(self, storage, cls_names):
+        """creates the mapping of the objects of cls_names in storage"""
+        self.__storage = storage
+        self.__cls_names = cls_names
+
+    def __iter__(self):
+        """yields the keys of the objects"""
+        return iter(self.__storage.keys(self.__cls_names))
+
+    def __len__(self):
+        """returns the number of objects"""
+        return len(self.__storage.keys(self.__cls_names))
+
+    def __getitem__(self, key):
+        """returns the object of key"""
+        obj = None
+        if key.split(".", 1)[0] in self.__cls_names:
+            obj = self.__storage.load(key, keep=False)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+
+class DBMStorage:
+    """stores instances as JSON records in a dbm database and keeps only
+    a working set of them in memory
+
+    Records are keyed by "<class name>.<id>". The ids of the objects
+    of a class are kept in the index record "#<class name>", those whose
+    foreign key has a given value in "#<class name>.<foreign key>=<value>",
+    those whose list of ids holds a given id in "#<class name>.<list>=<id>",
+    and the record "#versions" counts the objects and changes of every
+    class, so lookups read only the records they return. A save appends
+    the ids it adds or removes to the delta records "<index key>\n<n>"
+    of an index record, which are folded into it every FOLD_DELTAS
+    deltas, and empties the records it deletes, so that it only writes
+    records about the objects it changes.
+
+    Loaded objects stay in an LRU cache of at most HBNB_DBM_CACHE_BYTES
+    bytes of records; the objects stored, changed or deleted since the
+    last save stay in memory until it. Saves are flushed to disk at most
+    every HBNB_DBM_FLUSH_MS milliseconds, and the database is compacted
+    once its file has doubled since the last compaction. The database
+    is meant for one process, shared by its threads.
+    """
+
+    def __init__(self):
+        """Instantiate a DBMStorage object"""
+        self.__path = getenv('HBNB_DBM_PATH', 'hbnb.dbm')
+        self.__budget = int(getenv('HBNB_DBM_CACHE_BYTES',
+                                   64 * 1024 * 1024))
+        self.__flag = "n" if getenv('HBNB_ENV') == "test" else "c"
+        self.__db = None
+        # key: (obj, size of its record), least recently used first
+        self.__cache = OrderedDict()
+        self.__bytes = 0
+        # key: obj stored or changed, and keys deleted, since the last save
+        self.__dirty = {}
+        self.__deleted = set()
+        self.__lock = threading.RLock()
+        # index key: (number of its delta records, size of its record),
+        # least recently used first
+        self.__slots = OrderedDict()
+        self.__flush_interval = int(getenv('HBNB_DBM_FLUSH_MS', 1000)) / 1000
+        self.__flusher = None
+        self.__flushed = time.monotonic()
+        self.__unflushed = False
+        atexit.register(self.flush)
+
+    @staticmethod
+    def __name(cls):
+        """returns the class name of cls, a class or a class name"""
+        if type(cls) is not str:
+            cls = getattr(cls, "__name__", None)
+        return cls if cls in classes else None
+
+    def __read(self, key):
+        """returns the value of the record of key, None if there is
+        none; the caller holds the lock"""
+        data = self.__db.get(key.encode())
+        return loads(data) if data else None
+
+    def __write(self, key, value):
+        """writes the record of key, or empties it if value is empty:
+        deleting a key rewrites the whole index of dbm.dumb, an empty
+        record is dropped by the next compaction instead; the caller
+        holds the lock"""
+        if value:
+            self.__db[key.encode()] = dumps(value).encode()
+        elif self.__db.get(key.encode()):
+            self.__db[key.encode()] = b""
+
+    def __keep(self, key, obj, size):
+        """caches obj, evicting the least recently used objects over the
+        memory budget; the caller holds the lock"""
+        entry = self.__cache.pop(key, None)
+        if entry is not None:
+            self.__bytes -= entry[1]
+        self.__cache[key] = (obj, size)
+        self.__bytes += size
+        while self.__bytes > self.__budget and len(self.__cache) > 1:
+            self.__bytes -= self.__cache.popitem(last=False)[1][1]
+
+    def load(self, key, keep=True):
+        """returns the object of key, read from the database unless it
+        is in memory, None if there is none; keep caches what is read"""
+        with self.__lock:
+            if key in self.__deleted:
+                return None
+            obj = self.__dirty.get(key)
+            if obj is not None:
+                return obj
+            entry = self.__cache.get(key)
+            if entry is not None:
+                self.__cache.move_to_end(key)
+                return entry[0]
+            data = self.__db.get(key.encode())
+            if not data:
+                return None
+            value = loads(data)
+            obj = classes[value["__class__"]].from_storage(value)
+            if keep:
+                self.__keep(key, obj, len(data))
+            return obj
+
+    def keys(self, cls_names):
+        """returns the keys of the objects of cls_names, stored or not
+        saved yet, read from the index records of their classes"""
+        with self.__lock:
+            return [cls_name + "." + id for cls_name in cls_names
+                    for id in self.__ids(cls_name)]
+
+    def all(self, cls=None, load=None):
+        """returns the objects of class cls, or of every class, as a
+        mapping read from the database while it is iterated over; load
+        is accepted for compatibility with DBStorage"""
+        if cls is None:
+            return Records(self, set(classes))
+        cls_name = self.__name(cls)
+        return Records(self, {cls_name} if cls_name else set())
+
+    def new(self, obj):
+        """add the object to the objects to store on the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock:
+                entry = self.__cache.pop(key, None)
+                if entry is not None:
+                    self.__bytes -= entry[1]
+                self.__deleted.discard(key)
+                self.__dirty[key] = obj
+
+    def track(self, obj, attr, old):
+        """keeps a loaded obj in memory until the next save when one of
+        its attributes is set, unless another copy of it is the one in
+        memory"""
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", None))
+        with self.__lock:
+            if key in self.__dirty or key in self.__deleted:
+                return
+            entry = self.__cache.get(key)
+            if entry is not None:
+                if entry[0] is obj:
+                    self.new(obj)
+            elif self.__db.get(key.encode()):
+                self.new(obj)
+
+    @staticmethod
+    def __index(moves, cls_name, id, old, new):
+        """notes in moves, index record key: {id: True to add it, False
+        to remove it}, how id moves between the foreign key index
+        records of the values of the records old and new, the link index
+        records of the ids in their lists, and in or out of the index
+        record of the class"""
+        if not old or not new:
+            moves.setdefault("#" + cls_name, {})[id] = bool(new)
+        for attr in foreign_keys.get(cls_name, ()):
+            before = old.get(attr) if old else None
+            after = new.get(attr) if new else None
+            if old and new and before == after:
+                continue
+            if old:
+                key = "#{}.{}={}".format(cls_name, attr, before)
+                moves.setdefault(key, {})[id] = False
+            if new:
+                key = "#{}.{}={}".format(cls_name, attr, after)
+                moves.setdefault(key, {})[id] = True
+        for attr in link_keys.get(cls_name, ()):
+            before = set(old.get(attr) or ()) if old else set()
+            after = set(new.get(attr) or ()) if new else set()
+            for value in before ^ after:
+                key = "#{}.{}={}".format(cls_name, attr, value)
+                moves.setdefault(key, {})[id] = value in after
+
+    def __indexed(self, key):
+        """returns the set of ids of the index record of key and of its
+        delta records; the caller holds the lock"""
+        data = self.__db.get(key.encode())
+        ids = set(loads(data) if data else ())
+        slot = 0
+        while True:
+            delta = self.__read("{}\n{}".format(key, slot + 1))
+            if not delta:
+                break
+            slot += 1
+            for id, add in delta.items():
+                if add:
+                    ids.add(id)
+                else:
+                    ids.discard(id)
+        self.__slot(key, slot, len(data or b""))
+        return ids
+
+    def __slot(self, key, slot=None, size=None):
+        """returns (number of delta records, size) of the index record
+        of key, or remembers them; the caller holds the lock"""
+        if slot is None:
+            entry = self.__slots.get(key)
+            if entry is None:
+                slot = 0
+                while self.__db.get("{}\n{}".format(key, slot + 1)
+                                    .encode()):
+                    slot += 1
+                entry = (slot, len(self.__db.get(key.encode()) or b""))
+            slot, size = entry
+        elif size is None:
+            size = self.__slots.get(key, (0, 0))[1]
+        self.__slots[key] = (slot, size)
+        self.__slots.move_to_end(key)
+        if len(self.__slots) > SLOTS:
+            self.__slots.popitem(last=False)
+        return slot, size
+
+    def __move(self, key, ids):
+        """appends the delta record of ids, id: True to add it, False to
+        remove it, to the index record of key, or folds its deltas into
+        it once it has FOLD_DELTAS of them, or the size of those of a
+        large index record; the caller holds the lock"""
+        slot, size = self.__slot(key)
+        if slot < max(FOLD_DELTAS, size // DELTA_BYTES):
+            self.__write("{}\n{}".format(key, slot + 1), ids)
+            self.__slot(key, slot + 1)
+            return
+        kept = self.__indexed(key)
+        kept.difference_update(id for id, add in ids.items() if not add)
+        kept.update(id for id, add in ids.items() if add)
+        self.__write(key, sorted(kept))
+        for slot in range(1, slot + 1):
+            self.__write("{}\n{}".format(key, slot), None)
+        self.__slot(key, 0, len(self.__db.get(key.encode()) or b""))
+
+    def save(self):
+        """writes the objects stored, changed or deleted since the last
+        save, then a delta of each index record they change; the writes
+        reach the disk on the next flush"""
+        with self.__lock:
+            versions = self.__read(versions_key) or {}
+            now = time.time()
+            moves = {}
+            for key in self.__deleted:
+                cls_name, id = key.split(".", 1)
+                old = self.__read(key)
+                if old is None:
+                    continue
+                self.__index(moves, cls_name, id, old, None)
+                self.__write(key, None)
+                count, changes, when = versions.get(cls_name, (0, 0, None))
+                versions[cls_name] = (count - 1, changes + 1, now)
+            written = []
+            for key, obj in self.__dirty.items():
+                cls_name, id = key.split(".", 1)
+                old = self.__read(key)
+                value = codec(type(obj)).to_dict(obj, True, True)
+                data = dumps(value).encode()
+                self.__db[key.encode()] = data
+                self.__index(moves, cls_name, id, old, value)
+                count, changes, when = versions.get(cls_name, (0, 0, None))
+                versions[cls_name] = (count + (old is None), changes + 1,
+                                      now)
+                written.append((key, obj, len(data)))
+            for key, ids in moves.items():
+                self.__move(key, ids)
+            self.__write(versions_key, versions)
+            self.__dirty = {}
+            self.__deleted = set()
+            for key, obj, size in written:
+                self.__keep(key, obj, size)
+            self.__unflushed = True
+            if self.__flush_interval <= 0 or (time.monotonic() -
+                                              self.__flushed >=
+                                              self.__flush_interval):
+                self.flush()
+            elif self.__flusher is None:
+                self.__flusher = threading.Timer(self.__flush_interval,
+                                                 self.flush)
+                self.__flusher.daemon = True
+                self.__flusher.start()
+
+    def flush(self):
+        """writes the index of the database to disk, then compacts the
+        database if its file has doubled since the last compaction"""
+        with self.__lock:
+            if self.__flusher is not None:
+                self.__flusher.cancel()
+                self.__flusher = None
+            self.__flushed = time.monotonic()
+            if not self.__unflushed:
+                return
+            self.__unflushed = False
+            if hasattr(self.__db, "sync"):
+                self.__db.sync()
+            size = self.__size()
+            if size > max(2 * (self.__read(compacted_key) or 0),
+                          COMPACT_FLOOR):
+                self.compact()
+
+    def __files(self, path):
+        """returns the files of the database at path"""
+        directory, name = os.path.split(os.path.abspath(path))
+        try:
+            found = os.listdir(directory)
+        except OSError:
+            return []
+        return [os.path.join(directory, file) for file in found
+                if file == name or file.startswith(name + ".")]
+
+    def __size(self):
+        """returns the size of the files of the database"""
+        size = 0
+        for file in self.__files(self.__path):
+            try:
+                size += os.path.getsize(file)
+            except OSError:
+                pass
+        return size
+
+    def compact(self):
+        """rewrites the database without the empty records and the
+        space left by the records overwritten, then reopens it"""
+        with self.__lock:
+            tmp = self.__path + ".compact"
+            for file in self.__files(tmp):
+                os.remove(file)
+            new = dbm.open(tmp, "n")
+            try:
+                for key in self.__db.keys():
+                    data = self.__db[key]
+                    if data and key != compacted_key.encode():
+                        new[key] = data
+            finally:
+                new.close()
+            self.__db.close()
+            for file in self.__files(tmp):
+                os.replace(file, self.__path + file[len(
+                    os.path.abspath(tmp)):])
+            self.__db = dbm.open(self.__path, "c")
+            self.__slots.clear()
+            self.__write(compacted_key, self.__size())
+            if hasattr(self.__db, "sync"):
+                self.__db.sync()
+
+    def delete(self, obj=None):
+        """delete obj from the database on the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock:
+                entry = self.__cache.pop(key, None)
+                if entry is not None:
+                    self.__bytes -= entry[1]
+                self.__dirty.pop(key, None)
+                self.__deleted.add(key)
+
+    def reload(self):
+        """opens the database, creating it if it does not exist, and
+        forgets the objects in memory"""
+        with self.__lock:
+            if self.__db is not None:
+                self.flush()
+                self.__db.close()
+            self.__db = dbm.open(self.__path, self.__flag)
+            self.__flag = "c"
+            if not self.__read(versions_key):
+                self.__write(versions_key, {"": uuid.uuid4().int >> 97})
+                self.__unflushed = True
+            self.__cache = OrderedDict()
+            self.__bytes = 0
+            self.__dirty = {}
+            self.__deleted = set()
+            self.__slots = OrderedDict()
+
+    def close(self):
+        """keeps the working set in memory for the next requests; the
+        changes not saved stay pending, like in FileStorage"""
+        pass
+
+    def get(self, cls, id):
+        """A method used to get/retrieve an object from
+        the storage by using the class and id.
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None or type(id) is not str:
+            return None
+        return self.load(cls_name + "." + id)
+
+    def get_many(self, cls, ids, load=None):
+        """returns the objects of class cls found for the given ids,
+        in the order of ids; load is accepted for compatibility with
+        DBStorage
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return []
+        found = [self.load(cls_name + "." + str(id)) for id in ids]
+        return [obj for obj in found if obj is not None]
+
+    def count(self, cls=None):
+        """A method used to count the number of objects in
+        storage that matches the given class.
+        """
+        if not cls:
+            return sum(self.counts().values())
+        return self.counts().get(self.__name(cls), 0)
+
+    def counts(self):
+        """returns the number of objects of every class, by class name,
+        from the versions record"""
+        with self.__lock:
+            versions = self.__read(versions_key) or {}
+        return {name: versions.get(name, (0,))[0] for name in classes}
+
+    def version(self, cls=None):
+        """returns (tag, time) for the objects of class cls, or all
+        objects if cls is None: tag changes whenever one of them is
+        saved or deleted, time is the datetime of the last save that
+        changed them, None if there was none
+        """
+        with self.__lock:
+            versions = self.__read(versions_key) or {}
+        if cls is None:
+            names = list(classes)
+        else:
+            names = [self.__name(cls)]
+        entries = [versions.get(name, (0, 0, None)) for name in names]
+        tag = "{:x}-{}-{}".format(versions.get("", 0),
+                                  sum(entry[0] for entry in entries),
+                                  sum(entry[1] for entry in entries))
+        when = max((entry[2] for entry in entries if entry[2]), default=None)
+        return tag, datetime.utcfromtimestamp(when) if when else None
+
+    def __ids(self, cls_name, attr=None, value=None):
+        """returns the ids of the objects of class cls_name, or only of
+        those whose foreign key attr equals value, or whose list attr
+        holds value"""
+        with self.__lock:
+            if attr is None:
+                ids = self.__indexed("#" + cls_name)
+            else:
+                ids = self.__indexed("#{}.{}={}".format(cls_name, attr,
+                                                        value))
+            links = attr in link_keys.get(cls_name, ())
+            for key, obj in self.__dirty.items():
+                if key.startswith(cls_name + "."):
+                    if links:
+                        found = value in (getattr(obj, attr, None) or ())
+                    else:
+                        found = getattr(obj, attr, None) == value
+                    if attr is None or found:
+                        ids.add(obj.id)
+                    else:
+                        ids.discard(obj.id)
+            for key in self.__deleted:
+                if key.startswith(cls_name + "."):
+                    ids.discard(key.split(".", 1)[1])
+            return ids
+
+    def related(self, cls, attr, value):
+        """returns the list of objects of class cls whose attribute
+        attr equals value
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return []
+        if attr in foreign_keys.get(cls_name, ()):
+            return self.get_many(cls_name, self.__ids(cls_name, attr, value))
+        return [obj for obj in self.all(cls_name).values()
+                if getattr(obj, attr, None) == value]
+
+    def link_amenity(self, place, amenity):
+        """links amenity to place, returns False if it already was"""
+        if amenity.id in place.amenity_ids:
+            return False
+        place.amenity_ids = place.amenity_ids + [amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def unlink_amenity(self, place, amenity):
+        """unlinks amenity from place, returns False if it was not
+        linked"""
+        if amenity.id not in place.amenity_ids:
+            return False
+        place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                             if amenity_id != amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of class cls in the order of
+        their ids, starting after the id after; with attr, only those
+        whose foreign key attr equals value
+
+        Only ids are sorted: those of the index record of value, or of
+        the class, then the page of objects is read.
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return []
+        if attr is None:
+            ids = self.__ids(cls_name)
+        elif attr in foreign_keys.get(cls_name, ()):
+            ids = self.__ids(cls_name, attr, value)
+        else:
+            return sorted((obj for obj in self.related(cls, attr, value)
+                           if after is None or obj.id > after),
+                          key=lambda obj: obj.id)[:limit]
+        ids = nsmallest(limit, (id for id in ids
+                                if after is None or id > after))
+        return self.get_many(cls_name, ids)
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after=None, limit=None, ids_only=False):
+        """returns the places in the given states or cities, all places
+        if none is given, that have every one of the given amenities;
+        with limit, only the page of page(Place, limit, after); with
+        ids_only, only their ids
+
+        The ids found are those of the city index records of the cities,
+        intersected with the link index records of the amenities, so only
+        the places returned are read.
+        """
+        ids = None
+        if states or cities:
+            city_ids = set(cities or ())
+            for state_id in set(states or ()):
+                city_ids.update(self.__ids("City", "state_id", state_id))
+            ids = set()
+            for city_id in city_ids:
+                ids.update(self.__ids("Place", "city_id", city_id))
+        for amenity_id in set(amenities or ()):
+            if ids is not None and not ids:
+                break
+            with_it = self.__ids("Place", "amenity_ids", amenity_id)
+            ids = with_it if ids is None else ids & with_it
+        if ids is None:
+            ids = self.__ids("Place")
+        if after is not None:
+            ids = {id for id in ids if id > after}
+        if limit is not None:
+            ids = nsmallest(limit, ids)
+        if ids_only:
+            return list(ids)
+        return self.get_many(Place, ids)
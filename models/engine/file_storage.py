@@ -3,18 +3,37 @@
 Contains the FileStorage class
 """
 
-import json
+import atexit
+from bisect import bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+import fcntl
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, codec, forget_json
 from models.city import City
+from models.engine.bitmap_index import BitmapIndex
+from models.engine.json_backend import dumps, loads
+from models.engine.rwlock import RWLock
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from hashlib import md5
+from heapq import nsmallest
+import os
+from os import getenv
+import threading
+import time
+import uuid
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# foreign keys indexed by FileStorage: <class name>: (attribute names)
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+# list attributes indexed by FileStorage in a BitmapIndex:
+# <class name>: (attribute names)
+list_keys = {"Place": ("amenity_ids",)}
 
 
 class FileStorage:
@@ -24,77 +43,597 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __classes = {}
+    # dictionary - (<class name>, foreign key): {value: {key: obj}}
+    __related = {}
+    # dictionary - (<class name>, list attribute): BitmapIndex of the
+    # items of the list of every object
+    __bitmaps = {}
+    # dictionary - (<class name>,) or (<class name>, foreign key, value):
+    # sorted ids of the objects of that group, kept for the groups that
+    # were paged through
+    __orders = {}
+    # the __objects dictionary that the indexes were built from
+    __indexed = None
+    # sets - keys stored or deleted since the last save
+    __pending = set()
+    __removed = set()
+    # dictionary - last '"<key>": {...}' JSON text written for each
+    # unchanged object
+    __fragments = {}
+    # (inode, size, mtime) of the JSON file when it was last read or written
+    __marker = None
+    # number of journal bytes already applied to __objects
+    __log_offset = 0
+    # dictionary - <class name>, or None for all classes: (number of
+    # changes, time of the last one) since this process started, told
+    # apart from other processes' by __token
+    __versions = {}
+    __token = uuid.uuid4().hex[:12]
+    # many readers or one writer of __objects and the indexes; readers
+    # never wait for disk I/O, which is serialized by __io_lock
+    __lock = RWLock()
+    __io_lock = threading.RLock()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def __init__(self):
+        """reads the FileStorage options from the environment"""
+        self.__journal = getenv("HBNB_FILE_MODE") == "journal"
+        self.__compact_size = int(getenv("HBNB_FILE_COMPACT_SIZE",
+                                         8 * 1024 * 1024))
+        flush_ms = getenv("HBNB_FILE_FLUSH_MS")
+        self.__flush_interval = int(flush_ms) / 1000 if flush_ms else None
+        self.__flush_changes = int(getenv("HBNB_FILE_FLUSH_CHANGES", 1000))
+        # write-behind: time of the first save not flushed yet, the
+        # flusher thread and the condition it waits on
+        self.__dirty_since = None
+        self.__flusher = None
+        self.__wakeup = threading.Condition()
+
+    def __index(self):
+        """returns the per-class partitions, rebuilding all the indexes
+        if __objects was replaced from outside"""
+        if FileStorage.__indexed is not self.__objects:
+            with self.__lock.writing():
+                FileStorage.__classes = {}
+                FileStorage.__related = {}
+                FileStorage.__bitmaps = {}
+                FileStorage.__orders = {}
+                FileStorage.__fragments = {}
+                FileStorage.__indexed = self.__objects
+                for key, obj in self.__objects.items():
+                    self.__link(key, obj)
+                for cls_name in classes:
+                    self.__bump(cls_name)
+        return self.__classes
+
+    def __order(self, group, id, add):
+        """adds id to, or removes it from, the sorted ids of group if
+        they are kept"""
+        ids = self.__orders.get(group)
+        if ids is None:
+            return
+        if add:
+            insort(ids, id)
+            return
+        i = bisect_right(ids, id) - 1
+        if i >= 0 and ids[i] == id:
+            del ids[i]
+
+    def __link(self, key, obj):
+        """adds obj to the per-class partition and foreign key indexes"""
+        cls_name = obj.__class__.__name__
+        self.__classes.setdefault(cls_name, {})[key] = obj
+        self.__order((cls_name,), obj.id, True)
+        for attr in foreign_keys.get(cls_name, ()):
+            value = getattr(obj, attr, None)
+            by_value = self.__related.setdefault((cls_name, attr), {})
+            by_value.setdefault(value, {})[key] = obj
+            self.__order((cls_name, attr, value), obj.id, True)
+        for attr in list_keys.get(cls_name, ()):
+            bitmap = self.__bitmaps.setdefault((cls_name, attr),
+                                               BitmapIndex())
+            bitmap.add(key, getattr(obj, attr, None))
+
+    def __unlink(self, key, obj):
+        """removes obj from the per-class partition and foreign key
+        indexes"""
+        cls_name = obj.__class__.__name__
+        self.__classes.get(cls_name, {}).pop(key, None)
+        self.__order((cls_name,), obj.id, False)
+        for attr in foreign_keys.get(cls_name, ()):
+            value = getattr(obj, attr, None)
+            by_value = self.__related.get((cls_name, attr), {})
+            by_value.get(value, {}).pop(key, None)
+            self.__order((cls_name, attr, value), obj.id, False)
+        for attr in list_keys.get(cls_name, ()):
+            if (cls_name, attr) in self.__bitmaps:
+                self.__bitmaps[(cls_name, attr)].remove(key)
+
+    def all(self, cls=None, load=None):
+        """returns the dictionary __objects; load is accepted for
+        compatibility with DBStorage, relationships come from indexes"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if type(cls) is not str:
+                cls = cls.__name__
+            partitions = self.__index()
+            with self.__lock.reading():
+                return dict(partitions.get(cls, {}))
         return self.__objects
 
+    def __bump(self, cls_name):
+        """counts a change to the objects of class cls_name; the caller
+        holds the write lock"""
+        now = time.time()
+        for name in (cls_name, None):
+            changes = self.__versions.get(name, (0, None))[0]
+            self.__versions[name] = (changes + 1, now)
+
+    def __put(self, key, obj):
+        """stores obj under key in __objects and the indexes; the caller
+        holds the write lock"""
+        old = self.__objects.get(key)
+        if old is not None:
+            self.__unlink(key, old)
+            if old is not obj:
+                forget_json(old)
+        self.__bump(obj.__class__.__name__)
+        self.__fragments.pop(key, None)
+        self.__link(key, obj)
+        self.__objects[key] = obj
+
+    def __drop(self, key):
+        """removes the object stored under key, if any; the caller holds
+        the write lock"""
+        if key in self.__objects:
+            obj = self.__objects.pop(key)
+            self.__unlink(key, obj)
+            self.__bump(obj.__class__.__name__)
+        self.__fragments.pop(key, None)
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__index()
+            with self.__lock.writing():
+                self.__put(key, obj)
+                self.__removed.discard(key)
+                self.__pending.add(key)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path), or
+        only appends the changes to the journal in journal mode; in
+        write-behind mode the write is left to the flusher thread"""
+        if self.__flush_interval is None:
+            self.__write()
+            return
+        with self.__wakeup:
+            if self.__flusher is None:
+                self.__flusher = threading.Thread(
+                    target=self.__flush_loop, name="FileStorage-flusher",
+                    daemon=True)
+                self.__flusher.start()
+                atexit.register(self.flush)
+            if self.__dirty_since is None:
+                self.__dirty_since = time.monotonic()
+            self.__wakeup.notify()
 
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+    def flush(self):
+        """writes the changes saved so far to disk before returning"""
+        with self.__io_lock:
+            with self.__wakeup:
+                if self.__dirty_since is None:
+                    return
+                self.__dirty_since = None
+            self.__write()
+
+    def __flush_loop(self):
+        """flusher thread: flushes at most every HBNB_FILE_FLUSH_MS
+        milliseconds, or as soon as HBNB_FILE_FLUSH_CHANGES objects
+        changed"""
+        while True:
+            with self.__wakeup:
+                while self.__dirty_since is None:
+                    self.__wakeup.wait()
+                while self.__dirty_since is not None:
+                    changes = len(self.__pending) + len(self.__removed)
+                    left = (self.__dirty_since + self.__flush_interval -
+                            time.monotonic())
+                    if left <= 0 or changes >= self.__flush_changes:
+                        break
+                    self.__wakeup.wait(left)
+            self.flush()
+
+    def __write(self):
+        """writes the changes to the journal or a new snapshot"""
+        with self.__io_lock:
+            if self.__journal:
+                self.__append()
+            else:
+                self.__write_snapshot()
+
+    def __keep(self, fragments):
+        """caches the JSON text just written for objects that were not
+        changed again while it was being written"""
+        with self.__lock.writing():
+            for key, fragment in fragments.items():
+                if key not in self.__pending and key not in self.__removed:
+                    self.__fragments[key] = fragment
+
+    def __write_snapshot(self):
+        """writes every object of __objects to the JSON file; the objects
+        are serialized outside of the lock"""
+        self.__index()
+        with self.__lock.reading():
+            FileStorage.__pending = set()
+            FileStorage.__removed = set()
+            items = list(self.__objects.items())
+            cached = self.__fragments
+            parts = [cached.get(key) for key, obj in items]
+        fresh = {}
+        for i, (key, obj) in enumerate(items):
+            if parts[i] is None:
+                parts[i] = dumps(key) + ": " + \
+                    dumps(codec(type(obj)).to_dict(obj, True, True))
+                fresh[key] = parts[i]
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            f.write("{" + ", ".join(parts) + "}")
+        os.replace(tmp_path, self.__file_path)
+        FileStorage.__marker = self.__stat(self.__file_path)
+        self.__keep(fresh)
+
+    def __append(self):
+        """appends the objects stored or deleted since the last save to
+        the journal, one {key: object or null} record per line"""
+        self.__index()
+        with self.__lock.reading():
+            removed, FileStorage.__removed = self.__removed, set()
+            pending, FileStorage.__pending = self.__pending, set()
+            items = [(key, self.__objects.get(key)) for key in pending]
+            cached = self.__fragments
+            parts = [cached.get(key) for key, obj in items]
+        records = [dumps({key: None}) for key in removed]
+        fresh = {}
+        for i, (key, obj) in enumerate(items):
+            if obj is None:
+                continue
+            if parts[i] is None:
+                parts[i] = dumps(key) + ": " + \
+                    dumps(codec(type(obj)).to_dict(obj, True, True))
+                fresh[key] = parts[i]
+            records.append("{" + parts[i] + "}")
+        if not records:
+            return
+        with self.__locked(fcntl.LOCK_SH):
+            with open(self.__file_path + ".log", 'a',
+                      encoding="utf-8") as f:
+                start = os.fstat(f.fileno()).st_size
+                f.write("\n".join(records) + "\n")
+                size = f.tell()
+        if start == self.__log_offset:
+            # nobody else appended since our last read: skip our records
+            FileStorage.__log_offset = size
+        self.__keep(fresh)
+        if size >= self.__compact_size:
+            self.compact()
+
+    @contextmanager
+    def __locked(self, operation):
+        """holds the lock file of the JSON file with the flock operation:
+        shared to read or append to the journal, exclusive to replace it
+        and the snapshot"""
+        with open(self.__file_path + ".lock", 'a') as f:
+            fcntl.flock(f.fileno(), operation)
+            yield
+
+    def compact(self):
+        """folds the journal into a new snapshot of the JSON file, after
+        applying what other processes appended to it; the snapshot and the
+        empty journal replace the files in turn while no other process
+        reads or appends"""
+        with self.__io_lock, self.__locked(fcntl.LOCK_EX):
+            self.__read()
+            self.__write_snapshot()
+            log_path = self.__file_path + ".log"
+            open(log_path + ".tmp", 'w').close()
+            os.replace(log_path + ".tmp", log_path)
+            FileStorage.__log_offset = 0
+
+    @staticmethod
+    def __stat(path):
+        """returns a marker that changes whenever the file at path does"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
-            pass
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def reload(self):
+        """deserializes the JSON file to __objects, then replays the
+        journal in journal mode; files unchanged since they were last
+        read or written are skipped"""
+        self.__index()
+        with self.__io_lock:
+            if not self.__journal:
+                self.__read()
+                return
+            with self.__locked(fcntl.LOCK_SH):
+                self.__read()
+
+    def __read(self):
+        """reads the JSON file if it changed, then replays the journal in
+        journal mode; the caller holds __io_lock"""
+        marker = self.__stat(self.__file_path)
+        if marker != self.__marker:
+            try:
+                with open(self.__file_path, 'rb') as f:
+                    jo = loads(f.read())
+                with self.__lock.writing():
+                    for key in jo:
+                        self.__load(key, jo[key])
+            except:
+                pass
+            FileStorage.__marker = marker
+            FileStorage.__log_offset = 0
+        if self.__journal:
+            self.__replay()
+
+    def __load(self, key, value):
+        """stores the object of a record read from disk, unless the
+        stored object was read or written as that very record; the
+        caller holds the write lock"""
+        if key in self.__pending or key in self.__removed:
+            # changed here since the last save: ours is newer
+            return
+        fragment = dumps(key) + ": " + dumps(value)
+        if key in self.__objects and self.__fragments.get(key) == fragment:
+            return
+        self.__put(key, classes[value["__class__"]].from_storage(value))
+        self.__fragments[key] = fragment
+
+    def __replay(self):
+        """applies the journal records not applied yet to __objects, in
+        order"""
+        log_path = self.__file_path + ".log"
+        marker = self.__stat(log_path)
+        if marker is None or marker[1] == self.__log_offset:
+            return
+        if marker[1] < self.__log_offset:
+            FileStorage.__log_offset = 0
+        records = []
+        with open(log_path, 'rb') as f:
+            f.seek(self.__log_offset)
+            for line in f:
+                try:
+                    record = loads(line)
+                except ValueError:
+                    record = None
+                if record is None or not line.endswith(b"\n"):
+                    # a torn record left by an interrupted write
+                    break
+                records.append((len(line), record))
+        with self.__lock.writing():
+            for size, record in records:
+                for key, value in record.items():
+                    if value is None:
+                        if key not in self.__pending:
+                            self.__drop(key)
+                    else:
+                        self.__load(key, value)
+                FileStorage.__log_offset += size
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            self.__index()
+            with self.__lock.writing():
+                if key in self.__objects:
+                    self.__drop(key)
+                    self.__pending.discard(key)
+                    self.__removed.add(key)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
+        """call reload() method for deserializing the JSON file to objects
+        if it changed"""
         self.reload()
 
     def get(self, cls, id):
         """A method used to get/retrieve an object from
         the storage by using the class and id.
         """
-        if cls not in classes.values():
+        if type(cls) is not str:
+            cls = getattr(cls, "__name__", None)
+        if cls not in classes or type(id) is not str:
             return None
+        # a single dictionary lookup needs no lock
+        return self.__objects.get(cls + "." + id)
 
-        all_objs = models.storage.all(cls)
-        for value in all_objs.values():
-            if (value.id == id):
-                return value
-
-        return None
+    def get_many(self, cls, ids, load=None):
+        """returns the objects of class cls found for the given ids,
+        in the order of ids; load is accepted for compatibility with
+        DBStorage
+        """
+        if type(cls) is not str:
+            cls = getattr(cls, "__name__", None)
+        if cls not in classes:
+            return []
+        objects = self.__objects
+        found = []
+        with self.__lock.reading():
+            for id in ids:
+                obj = objects.get(cls + "." + str(id))
+                if obj is not None:
+                    found.append(obj)
+        return found
 
     def count(self, cls=None):
         """A method used to count the number of objects in
         storage that matches the given class.
         """
-        all_cls = classes.values()
-
+        partitions = self.__index()
         if not cls:
-            count = 0
-            for c in all_cls:
-                count += len(models.storage.all(c).values())
-        else:
-            count = len(models.storage.all(cls).values())
+            with self.__lock.reading():
+                return sum(len(objs) for objs in partitions.values())
+        if type(cls) is not str:
+            cls = cls.__name__
+        return len(partitions.get(cls, {}))
+
+    def counts(self):
+        """returns the number of objects of every class, by class name"""
+        partitions = self.__index()
+        with self.__lock.reading():
+            return {name: len(partitions.get(name, {})) for name in classes}
+
+    def version(self, cls=None):
+        """returns (tag, time) for the objects of class cls, or all
+        objects if cls is None: tag changes whenever one of them does,
+        time is the datetime of the last change, None if unknown
+        """
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        self.__index()
+        changes, when = self.__versions.get(cls, (0, None))
+        tag = "{}-{}".format(self.__token, changes)
+        return tag, datetime.utcfromtimestamp(when) if when else None
+
+    def related(self, cls, attr, value):
+        """returns the list of objects of class cls whose attribute
+        attr equals value
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        partitions = self.__index()
+        with self.__lock.reading():
+            if attr in foreign_keys.get(cls, ()):
+                by_value = self.__related.get((cls, attr), {})
+                return list(by_value.get(value, {}).values())
+            return [obj for obj in partitions.get(cls, {}).values()
+                    if getattr(obj, attr, None) == value]
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of class cls in the order of
+        their ids, starting after the id after; with attr, only those
+        whose foreign key attr equals value
+
+        The sorted ids of a group are built the first time it is paged
+        through, then kept up to date by the indexes.
+        """
+        if type(cls) is not str:
+            cls = getattr(cls, "__name__", None)
+        if cls not in classes:
+            return []
+        if attr is not None and attr not in foreign_keys.get(cls, ()):
+            found = sorted((obj for obj in self.related(cls, attr, value)
+                            if after is None or obj.id > after),
+                           key=lambda obj: obj.id)
+            return found[:limit]
+        partitions = self.__index()
+        group = (cls,) if attr is None else (cls, attr, value)
+        ids = self.__orders.get(group)
+        if ids is None:
+            with self.__lock.writing():
+                ids = self.__orders.get(group)
+                if ids is None:
+                    if attr is None:
+                        objs = partitions.get(cls, {})
+                    else:
+                        by_value = self.__related.get((cls, attr), {})
+                        objs = by_value.get(value, {})
+                    ids = sorted(obj.id for obj in objs.values())
+                    self.__orders[group] = ids
+        objects = self.__objects
+        with self.__lock.reading():
+            start = bisect_right(ids, after) if after is not None else 0
+            return [objects[cls + "." + id]
+                    for id in ids[start:start + limit]]
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after=None, limit=None, ids_only=False):
+        """returns the places in the given states or cities, all places
+        if none is given, that have every one of the given amenities;
+        with limit, only the page of page(Place, limit, after); with
+        ids_only, only their ids
 
-        return count
+        The ids of the matching places are collected from the indexes
+        as sets: the places of the cities of the states, united with
+        the places of the cities. Those with every amenity are then
+        found in the amenity BitmapIndex.
+        """
+        if ids_only:
+            return [place.id for place in self.search_places(
+                states, cities, amenities, after, limit)]
+        partitions = self.__index()
+        related = self.__related
+        with self.__lock.reading():
+            keys = None
+            if states or cities:
+                city_ids = set(cities or ())
+                by_state = related.get(("City", "state_id"), {})
+                for state_id in set(states or ()):
+                    city_ids.update(city.id for city in
+                                    by_state.get(state_id, {}).values())
+                by_city = related.get(("Place", "city_id"), {})
+                keys = set()
+                for city_id in city_ids:
+                    keys.update(by_city.get(city_id, ()))
+            if amenities:
+                bitmap = self.__bitmaps.get(("Place", "amenity_ids"),
+                                            BitmapIndex())
+                keys = bitmap.having_all(amenities, keys)
+            places = partitions.get("Place", {})
+            if keys is None and limit is None:
+                return list(places.values())
+            if limit is None:
+                return [places[key] for key in keys]
+            if keys is not None:
+                start = "Place." + after if after is not None else ""
+                keys = nsmallest(limit, (key for key in keys if key > start))
+                return [places[key] for key in keys]
+        return self.page(Place, limit, after)
+
+    def link_amenity(self, place, amenity):
+        """links amenity to place, returns False if it already was"""
+        if amenity.id in place.amenity_ids:
+            return False
+        place.amenity_ids = place.amenity_ids + [amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def unlink_amenity(self, place, amenity):
+        """unlinks amenity from place, returns False if it was not
+        linked"""
+        if amenity.id not in place.amenity_ids:
+            return False
+        place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                             if amenity_id != amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def track(self, obj, attr, old):
+        """marks a stored obj as changed when one of its attributes is set
+        from old to a new value, moving it in the foreign key and list
+        indexes
+        """
+        cls_name = obj.__class__.__name__
+        key = cls_name + "." + str(getattr(obj, "id", None))
+        self.__index()
+        if self.__objects.get(key) is not obj:
+            return
+        with self.__lock.writing():
+            self.__pending.add(key)
+            self.__fragments.pop(key, None)
+            self.__bump(cls_name)
+            if attr in foreign_keys.get(cls_name, ()):
+                by_value = self.__related.setdefault((cls_name, attr), {})
+                by_value.get(old, {}).pop(key, None)
+                by_value.setdefault(getattr(obj, attr), {})[key] = obj
+                self.__order((cls_name, attr, old), obj.id, False)
+                self.__order((cls_name, attr, getattr(obj, attr)), obj.id,
+                             True)
+            elif attr in list_keys.get(cls_name, ()):
+                bitmap = self.__bitmaps.setdefault((cls_name, attr),
+                                                   BitmapIndex())
+                bitmap.add(key, getattr(obj, attr))
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+JSON encoding and decoding through the fastest backend installed:
+orjson, then ujson, then the json module of the standard library.
+
+HBNB_JSON_BACKEND names the backend to use instead. Every backend
+writes the same compact JSON, with datetimes in the time format of
+BaseModel, microseconds included.
+"""
+
+from datetime import datetime
+import json
+from os import getenv
+
+# name: (dumps, loads) of every backend installed, fastest first
+backends = {}
+
+
+def default(obj):
+    """returns the JSON value of obj, for the types JSON lacks"""
+    if isinstance(obj, datetime):
+        return obj.isoformat(timespec="microseconds")
+    raise TypeError("Object of type {} is not JSON serializable"
+                    .format(type(obj).__name__))
+
+
+def json_dumps(obj, sort_keys=False):
+    """returns the JSON text of obj"""
+    return json.dumps(obj, default=default, sort_keys=sort_keys,
+                      separators=(",", ":"))
+
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    def orjson_dumps(obj, sort_keys=False):
+        """returns the JSON text of obj, written by json for the values
+        orjson refuses, such as integers over 64 bits"""
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except orjson.JSONEncodeError:
+            return json_dumps(obj, sort_keys)
+
+    backends["orjson"] = (orjson_dumps, orjson.loads)
+
+try:
+    import ujson
+except ImportError:
+    pass
+else:
+    def ujson_dumps(obj, sort_keys=False):
+        """returns the JSON text of obj"""
+        return ujson.dumps(obj, ensure_ascii=False, sort_keys=sort_keys,
+                           escape_forward_slashes=False, default=default)
+
+    backends["ujson"] = (ujson_dumps, ujson.loads)
+
+
+backends["json"] = (json_dumps, json.loads)
+
+name = getenv("HBNB_JSON_BACKEND") or next(iter(backends))
+if name not in backends:
+    name = "json"
+dumps, loads = backends[name]
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Contains the RWLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class RWLock:
+    """a lock held by many readers at once or by a single writer
+
+    The writer may take the lock again, for reading or writing, while it
+    holds it, and a reader may read again. A reader must not ask for the
+    write lock. Waiting writers go before new readers.
+    """
+
+    def __init__(self):
+        """creates an unlocked RWLock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        """blocks until no writer holds or waits for the lock"""
+        depth = getattr(self.__local, "depth", 0)
+        with self.__cond:
+            if depth == 0 and self.__writer != threading.get_ident():
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+            self.__readers += 1
+        self.__local.depth = depth + 1
+
+    def release_read(self):
+        """releases a read acquisition"""
+        self.__local.depth -= 1
+        with self.__cond:
+            self.__readers -= 1
+            if self.__readers == 0:
+                self.__cond.notify_all()
+
+    def acquire_write(self):
+        """blocks until no other thread holds the lock"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__writes += 1
+                return
+            self.__waiting += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__waiting -= 1
+            self.__writer = me
+            self.__writes = 1
+
+    def release_write(self):
+        """releases a write acquisition"""
+        with self.__cond:
+            self.__writes -= 1
+            if self.__writes == 0:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """holds the lock for reading in a with block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """holds the lock for writing in a with block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
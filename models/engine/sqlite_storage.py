@@ -0,0 +1,411 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from datetime import datetime
+import models
+from models.amenity import Amenity
+from models.base_model import BaseModel
+from models.city import City
+from models.engine.json_backend import dumps, loads
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from os import getenv
+import sqlite3
+import threading
+import uuid
+
+classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
+           "Place": Place, "Review": Review, "State": State, "User": User}
+tables = {"Amenity": "amenities", "BaseModel": "base_models",
+          "City": "cities", "Place": "places", "Review": "reviews",
+          "State": "states", "User": "users"}
+# foreign keys stored in their own indexed column: <class name>: (names)
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+time = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class SQLiteStorage:
+    """stores instances in a SQLite database, one indexed table per class,
+    and the amenities of every place in the place_amenity table
+
+    Every thread gets its own connection and its own map of the objects
+    loaded or stored since its last close(), like a scoped session.
+    """
+
+    def __init__(self):
+        """Instantiate a SQLiteStorage object"""
+        self.__path = getenv('HBNB_SQLITE_DB', 'hbnb.sqlite3')
+        self.__local = threading.local()
+        if getenv('HBNB_ENV') == "test":
+            with self.__connection() as conn:
+                for table in list(tables.values()) + ["versions",
+                                                      "place_amenity"]:
+                    conn.execute("DROP TABLE IF EXISTS " + table)
+
+    def __connection(self):
+        """returns the connection of the current thread"""
+        conn = getattr(self.__local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.__path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.__local.conn = conn
+        return conn
+
+    def __session(self):
+        """returns the objects, changed keys and deleted keys of the
+        current thread"""
+        if getattr(self.__local, "objects", None) is None:
+            self.__local.objects = {}
+            self.__local.dirty = set()
+            self.__local.deleted = set()
+        return self.__local
+
+    @staticmethod
+    def __name(cls):
+        """returns the class name of cls, a class or a class name"""
+        if type(cls) is not str:
+            cls = getattr(cls, "__name__", None)
+        return cls if cls in classes else None
+
+    def __hydrate(self, cls_name, data):
+        """returns the object stored as data, reusing the object already
+        loaded by this thread"""
+        session = self.__session()
+        key = cls_name + "." + data["id"]
+        obj = session.objects.get(key)
+        if obj is None:
+            obj = session.objects[key] = classes[cls_name].from_storage(data)
+        return obj
+
+    def __select(self, cls_name, where="", params=()):
+        """returns the objects of class cls_name whose rows match where,
+        followed by the ones stored but not saved yet"""
+        session = self.__session()
+        rows = self.__connection().execute(
+            "SELECT data FROM " + tables[cls_name] + where, params)
+        found = {}
+        prefix = cls_name + "."
+        for (data,) in rows:
+            obj = self.__hydrate(cls_name, loads(data))
+            found[prefix + obj.id] = obj
+        for key in session.dirty:
+            if key.startswith(prefix) and key not in found:
+                found[key] = session.objects[key]
+        for key in session.deleted:
+            found.pop(key, None)
+        return found
+
+    def all(self, cls=None, load=None):
+        """query on the current database connection; load is accepted
+        for compatibility with DBStorage, relationships use indexes"""
+        new_dict = {}
+        for cls_name in classes:
+            if cls is None or self.__name(cls) == cls_name:
+                new_dict.update(self.__select(cls_name))
+        return new_dict
+
+    def new(self, obj):
+        """add the object to the objects to store on the next save"""
+        if obj is not None:
+            session = self.__session()
+            key = obj.__class__.__name__ + "." + obj.id
+            session.objects[key] = obj
+            session.deleted.discard(key)
+            session.dirty.add(key)
+
+    def track(self, obj, attr, old):
+        """marks a loaded obj as changed when one of its attributes is
+        set"""
+        session = self.__session()
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", None))
+        if session.objects.get(key) is obj:
+            session.dirty.add(key)
+
+    def save(self):
+        """writes the objects stored, changed or deleted since the last
+        save in one transaction, counting a change of their classes"""
+        session = self.__session()
+        names = {key.split(".", 1)[0]
+                 for key in session.dirty | session.deleted}
+        with self.__connection() as conn:
+            if names:
+                conn.execute("UPDATE versions SET changes = changes + 1, "
+                             "time = ? WHERE name IN ({})".format(
+                                 ", ".join("?" * len(names))),
+                             [datetime.utcnow().strftime(time)] +
+                             list(names))
+            for key in session.deleted:
+                cls_name, id = key.split(".", 1)
+                conn.execute("DELETE FROM " + tables[cls_name] +
+                             " WHERE id = ?", (id,))
+                if cls_name == "Place":
+                    conn.execute("DELETE FROM place_amenity "
+                                 "WHERE place_id = ?", (id,))
+            for key in session.dirty:
+                obj = session.objects[key]
+                cls_name = obj.__class__.__name__
+                columns = ("id", "created_at", "updated_at") + \
+                    foreign_keys.get(cls_name, ()) + ("data",)
+                data = obj.to_dict(save_fs=True)
+                values = [data.get(column) for column in columns[:-1]]
+                values.append(dumps(data))
+                conn.execute("INSERT OR REPLACE INTO {} ({}) VALUES ({})"
+                             .format(tables[cls_name], ", ".join(columns),
+                                     ", ".join("?" * len(columns))),
+                             values)
+                if cls_name == "Place":
+                    conn.execute("DELETE FROM place_amenity "
+                                 "WHERE place_id = ?", (obj.id,))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO place_amenity "
+                        "(amenity_id, place_id) VALUES (?, ?)",
+                        [(amenity_id, obj.id) for amenity_id in
+                         getattr(obj, "amenity_ids", None) or ()])
+        session.dirty.clear()
+        session.deleted.clear()
+
+    def delete(self, obj=None):
+        """delete obj from the database on the next save"""
+        if obj is not None:
+            session = self.__session()
+            key = obj.__class__.__name__ + "." + obj.id
+            session.objects.pop(key, None)
+            session.dirty.discard(key)
+            session.deleted.add(key)
+
+    def reload(self):
+        """creates the tables and indexes that do not exist yet"""
+        with self.__connection() as conn:
+            for cls_name, table in tables.items():
+                fks = foreign_keys.get(cls_name, ())
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS {} (id TEXT PRIMARY KEY, "
+                    "created_at TEXT, updated_at TEXT, {}data TEXT)"
+                    .format(table, "".join(fk + " TEXT, " for fk in fks)))
+                for fk in fks:
+                    conn.execute("CREATE INDEX IF NOT EXISTS {0}_{1} "
+                                 "ON {0} ({1})".format(table, fk))
+            # the amenities of every place, by amenity for the searches
+            conn.execute("CREATE TABLE IF NOT EXISTS place_amenity "
+                         "(amenity_id TEXT, place_id TEXT, "
+                         "PRIMARY KEY (amenity_id, place_id))")
+            conn.execute("CREATE INDEX IF NOT EXISTS place_amenity_place_id"
+                         " ON place_amenity (place_id)")
+            # number of changes and time of the last change of every
+            # class; the row named '' holds the generation of the
+            # database, so that tags differ once it is created again
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT "
+                         "PRIMARY KEY, changes INTEGER NOT NULL, time TEXT)")
+            conn.executemany("INSERT OR IGNORE INTO versions (name, changes)"
+                             " VALUES (?, ?)",
+                             [(name, 0) for name in classes] +
+                             [("", uuid.uuid4().int >> 97)])
+        self.__local.objects = None
+
+    def close(self):
+        """forgets the objects loaded or stored by the current thread"""
+        self.__local.objects = None
+
+    def get(self, cls, id):
+        """A method used to get/retrieve an object from
+        the storage by using the class and id.
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None or type(id) is not str:
+            return None
+        key = cls_name + "." + id
+        session = self.__session()
+        if key in session.deleted:
+            return None
+        if key in session.objects:
+            return session.objects[key]
+        row = self.__connection().execute(
+            "SELECT data FROM " + tables[cls_name] + " WHERE id = ?",
+            (id,)).fetchone()
+        return self.__hydrate(cls_name, loads(row[0])) if row else None
+
+    def get_many(self, cls, ids, load=None):
+        """returns the objects of class cls found for the given ids,
+        in the order of ids; load is accepted for compatibility with
+        DBStorage
+        """
+        cls_name = self.__name(cls)
+        ids = [str(id) for id in ids]
+        if cls_name is None or not ids:
+            return []
+        found = self.__select(cls_name, " WHERE id IN ({})".format(
+            ", ".join("?" * len(ids))), ids)
+        return [found[cls_name + "." + id] for id in ids
+                if cls_name + "." + id in found]
+
+    def count(self, cls=None):
+        """A method used to count the number of objects in
+        storage that matches the given class.
+        """
+        if not cls:
+            return sum(self.counts().values())
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return 0
+        return self.__connection().execute(
+            "SELECT COUNT(*) FROM " + tables[cls_name]).fetchone()[0]
+
+    def counts(self):
+        """returns the number of objects of every class, by class name,
+        with a single query
+        """
+        names = list(classes)
+        query = ", ".join("(SELECT COUNT(*) FROM {})".format(tables[name])
+                          for name in names)
+        row = self.__connection().execute("SELECT " + query).fetchone()
+        return dict(zip(names, row))
+
+    def version(self, cls=None):
+        """returns (tag, time) for the objects of class cls, or all
+        objects if cls is None: tag changes whenever one of them is
+        stored, updated or deleted, time is the datetime of the last
+        change, None if there was none; both come from the change
+        counters that save() bumps
+        """
+        if cls is None:
+            names = list(classes)
+        else:
+            names = [self.__name(cls)]
+            if names[0] is None:
+                return "0", None
+        rows = self.__connection().execute(
+            "SELECT name, changes, time FROM versions WHERE name IN ({})"
+            .format(", ".join("?" * (len(names) + 1))), names + [""])
+        generation, changes, latest = 0, 0, None
+        for name, count, when in rows:
+            if name == "":
+                generation = count
+                continue
+            changes += count
+            if when is not None and (latest is None or when > latest):
+                latest = when
+        tag = "{:x}-{}".format(generation, changes)
+        return tag, datetime.strptime(latest, time) if latest else None
+
+    def related(self, cls, attr, value):
+        """returns the list of objects of class cls whose attribute
+        attr equals value
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return []
+        if attr in foreign_keys.get(cls_name, ()):
+            found = self.__select(cls_name, " WHERE {} = ?".format(attr),
+                                  (value,))
+        else:
+            found = self.__select(cls_name)
+        return [obj for obj in found.values()
+                if getattr(obj, attr, None) == value]
+
+    def link_amenity(self, place, amenity):
+        """links amenity to place, returns False if it already was"""
+        if amenity.id in place.amenity_ids:
+            return False
+        place.amenity_ids = place.amenity_ids + [amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def unlink_amenity(self, place, amenity):
+        """unlinks amenity from place, returns False if it was not
+        linked"""
+        if amenity.id not in place.amenity_ids:
+            return False
+        place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                             if amenity_id != amenity.id]
+        place.updated_at = datetime.utcnow()
+        return True
+
+    def page(self, cls, limit, after=None, attr=None, value=None):
+        """returns at most limit objects of class cls in the order of
+        their ids, starting after the id after; with attr, only those
+        whose foreign key attr equals value
+        """
+        cls_name = self.__name(cls)
+        if cls_name is None:
+            return []
+        if attr is None or attr in foreign_keys.get(cls_name, ()):
+            where, params = " WHERE id > ?", [after or ""]
+            if attr is not None:
+                where += " AND {} = ?".format(attr)
+                params.append(value)
+            where += " ORDER BY id LIMIT ?"
+            params.append(limit)
+        else:
+            where, params = "", ()
+        found = self.__select(cls_name, where, params)
+        return sorted((obj for obj in found.values()
+                       if (after is None or obj.id > after) and
+                       (attr is None or getattr(obj, attr, None) == value)),
+                      key=lambda obj: obj.id)[:limit]
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      after=None, limit=None, ids_only=False):
+        """returns the places in the given states or cities, all places
+        if none is given, that have every one of the given amenities,
+        with a single query; with limit, only the page of page(Place,
+        limit, after); with ids_only, only their ids
+
+        The places stored, changed or deleted but not saved yet are
+        matched in memory instead.
+        """
+        session = self.__session()
+        pending = {key.split(".", 1)[1]
+                   for key in session.dirty | session.deleted
+                   if key.startswith("Place.")}
+        query = "SELECT p.id{} FROM places p".format(
+            "" if ids_only else ", p.data")
+        where, params = [], []
+        if states or cities:
+            states, cities = list(set(states or ())), list(set(cities or ()))
+            query += " JOIN cities c ON c.id = p.city_id"
+            where.append("(c.state_id IN ({}) OR c.id IN ({}))".format(
+                ", ".join("?" * len(states)), ", ".join("?" * len(cities))))
+            params.extend(states + cities)
+        amenities = list(set(amenities or ()))
+        if amenities:
+            where.append("p.id IN (SELECT place_id FROM place_amenity "
+                         "WHERE amenity_id IN ({}) GROUP BY place_id "
+                         "HAVING COUNT(*) = ?)".format(
+                             ", ".join("?" * len(amenities))))
+            params.extend(amenities + [len(amenities)])
+        if after is not None:
+            where.append("p.id > ?")
+            params.append(after)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if limit is not None:
+            # the pending places found are dropped from the page
+            query += " ORDER BY p.id LIMIT ?"
+            params.append(limit + len(pending))
+        found = {}
+        for row in self.__connection().execute(query, params):
+            if row[0] not in pending:
+                found[row[0]] = row[0] if ids_only else \
+                    self.__hydrate("Place", loads(row[1]))
+        if pending:
+            city_ids = set(cities or ())
+            for state_id in states or ():
+                city_ids.update(city.id for city in
+                                self.related(City, "state_id", state_id))
+            for key in session.dirty:
+                place = session.objects[key]
+                if (key.startswith("Place.") and
+                        (not (states or cities) or
+                         place.city_id in city_ids) and
+                        set(amenities).issubset(place.amenity_ids) and
+                        (after is None or place.id > after)):
+                    found[place.id] = place.id if ids_only else place
+        if limit is not None:
+            return [found[id] for id in sorted(found)[:limit]]
+        return list(found.values())
@@ -1,7 +1,7 @@
 #!/usr/bin/python
 """ holds class Place"""
 import models
-from models.base_model import BaseModel, Base
+from models.base_model import CompactModel, Base, Field, Key
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, Integer, Float, ForeignKey, Table
@@ -19,7 +19,7 @@ if models.storage_t == 'db':
                                  primary_key=True))
 
 
-class Place(BaseModel, Base):
+class Place(CompactModel, Base):
     """Representation of Place """
     if models.storage_t == 'db':
         __tablename__ = 'places'
@@ -38,17 +38,21 @@ class Place(BaseModel, Base):
                                  backref="place_amenities",
                                  viewonly=False)
     else:
-        city_id = ""
-        user_id = ""
-        name = ""
-        description = ""
-        number_rooms = 0
-        number_bathrooms = 0
-        max_guest = 0
-        price_by_night = 0
-        latitude = 0.0
-        longitude = 0.0
-        amenity_ids = []
+        __slots__ = ("_city_id", "_user_id", "_name", "_description",
+                     "_number_rooms", "_number_bathrooms", "_max_guest",
+                     "_price_by_night", "_latitude", "_longitude",
+                     "_amenity_ids")
+        city_id = Key("")
+        user_id = Key("")
+        name = Field("")
+        description = Field("")
+        number_rooms = Field(0)
+        number_bathrooms = Field(0)
+        max_guest = Field(0)
+        price_by_night = Field(0)
+        latitude = Field(0.0)
+        longitude = Field(0.0)
+        amenity_ids = Field([])
 
     def __init__(self, *args, **kwargs):
         """initializes Place"""
@@ -59,20 +63,10 @@ class Place(BaseModel, Base):
         def reviews(self):
             """getter attribute returns the list of Review instances"""
             from models.review import Review
-            review_list = []
-            all_reviews = models.storage.all(Review)
-            for review in all_reviews.values():
-                if review.place_id == self.id:
-                    review_list.append(review)
-            return review_list
+            return models.storage.related(Review, "place_id", self.id)
 
         @property
         def amenities(self):
             """getter attribute returns the list of Amenity instances"""
             from models.amenity import Amenity
-            amenity_list = []
-            all_amenities = models.storage.all(Amenity)
-            for amenity in all_amenities.values():
-                if amenity.place_id == self.id:
-                    amenity_list.append(amenity)
-            return amenity_list
+            return models.storage.get_many(Amenity, self.amenity_ids)
@@ -1,13 +1,13 @@
 #!/usr/bin/python
 """ holds class Review"""
 import models
-from models.base_model import BaseModel, Base
+from models.base_model import CompactModel, Base, Field, Key
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, ForeignKey
 
 
-class Review(BaseModel, Base):
+class Review(CompactModel, Base):
     """Representation of Review """
     if models.storage_t == 'db':
         __tablename__ = 'reviews'
@@ -15,9 +15,10 @@ class Review(BaseModel, Base):
         user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
         text = Column(String(1024), nullable=False)
     else:
-        place_id = ""
-        user_id = ""
-        text = ""
+        __slots__ = ("_place_id", "_user_id", "_text")
+        place_id = Key("")
+        user_id = Key("")
+        text = Field("")
 
     def __init__(self, *args, **kwargs):
         """initializes Review"""
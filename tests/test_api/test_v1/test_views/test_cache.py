@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Contains the TestCacheDocs and TestLRUCache classes
+"""
+
+from api.v1.app import app
+from api.v1.views import cache
+import inspect
+import models
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+LRUCache = cache.LRUCache
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the cache module"""
+    def test_pep8_conformance_cache(self):
+        """Test that api/v1/views/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/cache.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_docstrings(self):
+        """Test for the module, class and function docstrings"""
+        self.assertTrue(len(cache.__doc__) >= 1)
+        self.assertTrue(len(LRUCache.__doc__) >= 1)
+        for func in inspect.getmembers(LRUCache, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+    def test_evicts_least_recently_used(self):
+        """Test that the entry used the longest ago goes first"""
+        lru = LRUCache(2, 100)
+        lru.put("a", "t", "A", 1)
+        lru.put("b", "t", "B", 1)
+        self.assertEqual(lru.get("a", "t"), "A")
+        lru.put("c", "t", "C", 1)
+        self.assertIsNone(lru.get("b", "t"))
+        self.assertEqual(lru.get("a", "t"), "A")
+        self.assertEqual(lru.get("c", "t"), "C")
+        self.assertEqual(lru.stats()["entries"], 2)
+
+    def test_byte_bound(self):
+        """Test that the sizes of the values never exceed max_bytes"""
+        lru = LRUCache(10, 10)
+        lru.put("a", "t", "A", 6)
+        lru.put("b", "t", "B", 6)
+        self.assertIsNone(lru.get("a", "t"))
+        self.assertEqual(lru.stats()["bytes"], 6)
+        lru.put("c", "t", "C", 11)
+        self.assertIsNone(lru.get("c", "t"))
+        self.assertEqual(lru.get("b", "t"), "B")
+        lru.put("b", "t", "B", 4)
+        self.assertEqual(lru.stats()["bytes"], 4)
+
+    def test_stale_tag(self):
+        """Test that an entry looked up with another tag is evicted"""
+        lru = LRUCache(10, 100)
+        lru.put("a", "v1", "A", 1)
+        self.assertIsNone(lru.get("a", "v2"))
+        self.assertIsNone(lru.get("a", "v1"))
+        self.assertEqual(lru.stats(), {'hits': 0, 'misses': 2,
+                                       'entries': 0, 'bytes': 0})
+
+    def test_ttl(self):
+        """Test that entries expire after ttl seconds"""
+        lru = LRUCache(10, 100, 5)
+        with mock.patch("time.monotonic", return_value=100):
+            lru.put("a", "t", "A", 1)
+        with mock.patch("time.monotonic", return_value=104):
+            self.assertEqual(lru.get("a", "t"), "A")
+        with mock.patch("time.monotonic", return_value=106):
+            self.assertIsNone(lru.get("a", "t"))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestCached(unittest.TestCase):
+    """Test the cached decorator on the list of states"""
+    def setUp(self):
+        """Starts from an empty response cache"""
+        cache.response_cache.clear()
+        self.client = app.test_client()
+
+    def test_cached_until_version_changes(self):
+        """Test that the list is served from the cache until a state is
+        stored"""
+        hits = cache.response_cache.hits
+        first = self.client.get("/api/v1/states").get_data()
+        self.assertEqual(self.client.get("/api/v1/states").get_data(),
+                         first)
+        self.assertEqual(cache.response_cache.hits, hits + 1)
+        state = State(name="Cached")
+        state.save()
+        try:
+            body = self.client.get("/api/v1/states").get_data()
+            self.assertIn(state.id.encode(), body)
+            self.assertEqual(cache.response_cache.hits, hits + 1)
+        finally:
+            models.storage.delete(state)
+            models.storage.save()
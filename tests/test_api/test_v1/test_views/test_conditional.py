@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs and TestConditional classes
+"""
+
+from api.v1.app import app
+from api.v1.views import conditional
+from api.v1.views.cache import response_cache
+import inspect
+import models
+import pep8
+import unittest
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional"""
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/views/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/conditional.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(conditional.__doc__) >= 1)
+        for func in inspect.getmembers(conditional, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestConditional(unittest.TestCase):
+    """Test conditional GETs of the lists of states and amenities and of
+    /stats"""
+    def setUp(self):
+        """Starts from an empty response cache"""
+        response_cache.clear()
+        self.client = app.test_client()
+
+    def etag(self, path):
+        """returns the ETag of a GET of path"""
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.headers["ETag"]
+
+    def assertModified(self, path, etag):
+        """checks that a GET of path with If-None-Match etag is answered
+        with the whole response and a new ETag"""
+        response = self.client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        return response.headers["ETag"]
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match is answered with 304"""
+        for path in ("/api/v1/states", "/api/v1/amenities",
+                     "/api/v1/stats"):
+            etag = self.etag(path)
+            response = self.client.get(path, headers={"If-None-Match":
+                                                      etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+            self.assertEqual(response.headers["ETag"], etag)
+            response = self.client.get(path, headers={
+                "If-None-Match": '"other", ' + etag})
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(path, headers={"If-None-Match":
+                                                      '"other"'})
+            self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_on_writes(self):
+        """Test that POST, PUT and DELETE of a state change the ETags of
+        the states and of /stats, and not that of the amenities"""
+        states = self.etag("/api/v1/states")
+        stats = self.etag("/api/v1/stats")
+        amenities = self.etag("/api/v1/amenities")
+        response = self.client.post("/api/v1/states",
+                                    json={"name": "Conditional"})
+        self.assertEqual(response.status_code, 201)
+        state_id = response.get_json()["id"]
+        try:
+            states = self.assertModified("/api/v1/states", states)
+            stats = self.assertModified("/api/v1/stats", stats)
+            response = self.client.put("/api/v1/states/" + state_id,
+                                       json={"name": "Renamed"})
+            self.assertEqual(response.status_code, 200)
+            states = self.assertModified("/api/v1/states", states)
+            response = self.client.get("/api/v1/states", headers={
+                "If-None-Match": states})
+            self.assertEqual(response.status_code, 304)
+        finally:
+            response = self.client.delete("/api/v1/states/" + state_id)
+            self.assertEqual(response.status_code, 200)
+        self.assertModified("/api/v1/states", states)
+        self.assertModified("/api/v1/stats", stats)
+        response = self.client.get("/api/v1/amenities", headers={
+            "If-None-Match": amenities})
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagingDocs, TestCursor, TestStream and TestPages classes
+"""
+
+from api.v1.app import app
+from api.v1.views import paging
+from base64 import urlsafe_b64encode
+from flask import jsonify
+import inspect
+import models
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestPagingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the paging module"""
+    def test_pep8_conformance_paging(self):
+        """Test that api/v1/views/paging.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/paging.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_paging.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_paging_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(paging.__doc__) >= 1)
+        for func in inspect.getmembers(paging, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+class TestCursor(unittest.TestCase):
+    """Test encode_cursor and decode_cursor"""
+    def test_round_trip(self):
+        """Test that a cursor gives back its id on its path"""
+        for id in ("0c3f4a5e-7d1b-4a9e-9a3f-1b2c3d4e5f60", "a", "é/+"):
+            with self.subTest(id=id):
+                cursor = paging.encode_cursor(id, "/api/v1/states")
+                self.assertRegex(cursor, "^[A-Za-z0-9_-]+$")
+                self.assertEqual(paging.decode_cursor(cursor,
+                                                      "/api/v1/states"), id)
+
+    def test_foreign_cursor(self):
+        """Test that the cursor of another path or a made up one is
+        refused"""
+        cursor = paging.encode_cursor("a", "/api/v1/states")
+        with self.assertRaises(ValueError):
+            paging.decode_cursor(cursor, "/api/v1/amenities")
+        made_up = urlsafe_b64encode(b"some-id").decode()
+        with self.assertRaises(ValueError):
+            paging.decode_cursor(made_up, "/api/v1/states")
+
+    def test_malformed_cursor(self):
+        """Test that a cursor that is not base64 is refused"""
+        for cursor in ("@@@", "a", "YW=*"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    paging.decode_cursor(cursor, "/api/v1/states")
+
+
+class TestStream(unittest.TestCase):
+    """Test the streamed list responses"""
+    @mock.patch.object(paging, "CHUNK_OBJECTS", 2)
+    def test_same_as_jsonify(self):
+        """Test that a streamed list, in one chunk or more, is the body
+        jsonify sends"""
+        states = [State(name="Streamed{}".format(i)) for i in range(5)]
+        states.append(State(name="Sé ☃ \"/\""))
+        with app.test_request_context():
+            for size in range(len(states) + 1):
+                with self.subTest(size=size):
+                    response = paging.list_response(states[:size])
+                    self.assertTrue(response.is_streamed)
+                    expected = jsonify([state.to_dict()
+                                        for state in states[:size]])
+                    self.assertEqual(response.get_data(),
+                                     expected.get_data())
+                    self.assertEqual(response.mimetype, expected.mimetype)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestPages(unittest.TestCase):
+    """Test paging through the list of states"""
+    def setUp(self):
+        """Stores states to page through"""
+        self.client = app.test_client()
+        self.states = [State(name="Paged{}".format(i)) for i in range(5)]
+        for state in self.states:
+            models.storage.new(state)
+        models.storage.save()
+
+    def tearDown(self):
+        """Removes the states"""
+        for state in self.states:
+            models.storage.delete(state)
+        models.storage.save()
+
+    def test_walk(self):
+        """Test that the pages list every state once, in id order, and
+        that only the last one has no X-Next-Cursor"""
+        ids, cursor = [], ""
+        while True:
+            response = self.client.get(
+                "/api/v1/states?limit=2&cursor=" + cursor)
+            self.assertEqual(response.status_code, 200)
+            page = [state["id"] for state in response.get_json()]
+            ids.extend(page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                self.assertLess(len(page), 2)
+                break
+            self.assertEqual(len(page), 2)
+        expected = sorted(obj.id for obj in
+                          models.storage.all(State).values())
+        self.assertEqual(ids, expected)
+
+    def test_bad_arguments(self):
+        """Test that a bad limit or cursor is answered with 400"""
+        cursor = paging.encode_cursor(self.states[0].id, "/api/v1/amenities")
+        for query in ("limit=0", "limit=x", "cursor=@@@", "cursor=_w",
+                      "cursor=" + cursor):
+            with self.subTest(query=query):
+                response = self.client.get("/api/v1/states?" + query)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesSearchDocs and TestSearchCache classes
+"""
+
+from api.v1.app import app
+from api.v1.views.cache import search_cache
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestPlacesSearchDocs(unittest.TestCase):
+    """Tests to check the style of the places_search tests"""
+    def test_pep8_conformance_test_places_search(self):
+        """Test that test_places_search.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_v1/test_views/\
+test_places_search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestSearchCache(unittest.TestCase):
+    """Test that places_search serves the ids it cached until a write
+    changes what it finds"""
+    def setUp(self):
+        """Stores a state, a city, a user, two amenities and two places,
+        one of them with the first amenity"""
+        self.client = app.test_client()
+        self.state = State(name="Searched")
+        self.city = City(name="Found", state_id=self.state.id)
+        self.user = User(email="search@hbnb.io", password="pwd")
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.with_wifi = Place(name="Wifi", city_id=self.city.id,
+                               user_id=self.user.id,
+                               amenity_ids=[self.wifi.id])
+        self.plain = Place(name="Plain", city_id=self.city.id,
+                           user_id=self.user.id)
+        self.objs = [self.state, self.city, self.user, self.wifi,
+                     self.pool, self.with_wifi, self.plain]
+        for obj in self.objs:
+            models.storage.new(obj)
+        models.storage.save()
+        search_cache.clear()
+
+    def tearDown(self):
+        """Removes the objects stored"""
+        for obj in self.objs:
+            models.storage.delete(obj)
+        models.storage.save()
+        search_cache.clear()
+
+    def search(self, criteria, query=""):
+        """returns the ids of the places found by a search"""
+        response = self.client.post("/api/v1/places_search" + query,
+                                    json=criteria)
+        self.assertEqual(response.status_code, 200)
+        return [place["id"] for place in response.get_json()]
+
+    def test_reordered_criteria(self):
+        """Test that a search with the same criteria reordered or
+        repeated is a hit of the same ids"""
+        found = self.search({"states": [self.state.id],
+                             "amenities": [self.wifi.id]})
+        self.assertEqual(found, [self.with_wifi.id])
+        hits = search_cache.stats()["hits"]
+        found = self.search({"amenities": [self.wifi.id, self.wifi.id],
+                             "states": [self.state.id, self.state.id]})
+        self.assertEqual(found, [self.with_wifi.id])
+        found = self.search({"cities": [], "amenities": [self.wifi.id],
+                             "states": [self.state.id]})
+        self.assertEqual(found, [self.with_wifi.id])
+        self.assertEqual(search_cache.stats()["hits"], hits + 2)
+
+    def test_link_amenity(self):
+        """Test that linking and unlinking an amenity changes what the
+        next search finds"""
+        criteria = {"cities": [self.city.id], "amenities": [self.pool.id]}
+        self.assertEqual(self.search(criteria), [])
+        path = "/api/v1/places/{}/amenities/{}".format(self.plain.id,
+                                                       self.pool.id)
+        self.assertEqual(self.client.post(path).status_code, 201)
+        self.assertEqual(self.search(criteria), [self.plain.id])
+        self.assertEqual(self.client.delete(path).status_code, 200)
+        self.assertEqual(self.search(criteria), [])
+
+    def test_place_writes(self):
+        """Test that creating, updating and deleting a place changes the
+        pages of the next searches"""
+        criteria = {"states": [self.state.id]}
+        ids = sorted([self.with_wifi.id, self.plain.id])
+        self.assertEqual(self.search(criteria), ids)
+        self.assertEqual(self.search(criteria, "?limit=1"), ids[:1])
+        response = self.client.post(
+            "/api/v1/cities/{}/places".format(self.city.id),
+            json={"name": "New", "user_id": self.user.id})
+        self.assertEqual(response.status_code, 201)
+        new_id = response.get_json()["id"]
+        try:
+            ids = sorted(ids + [new_id])
+            self.assertEqual(self.search(criteria), ids)
+            self.assertEqual(self.search(criteria, "?limit=1"), ids[:1])
+            criteria["amenities"] = [self.wifi.id]
+            self.assertEqual(self.search(criteria), [self.with_wifi.id])
+            response = self.client.put(
+                "/api/v1/places/" + self.with_wifi.id,
+                json={"amenity_ids": []})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.search(criteria), [])
+            del criteria["amenities"]
+        finally:
+            response = self.client.delete("/api/v1/places/" + new_id)
+            self.assertEqual(response.status_code, 200)
+        ids.remove(new_id)
+        self.assertEqual(self.search(criteria), ids)
+        self.assertEqual(self.search(criteria, "?limit=1"), ids[:1])
+
+    def test_ttl(self):
+        """Test that the ids cached expire after the time to live"""
+        criteria = {"cities": [self.city.id]}
+        with mock.patch.object(search_cache, "ttl", 5):
+            with mock.patch("time.monotonic", return_value=100):
+                self.search(criteria)
+                hits = search_cache.stats()["hits"]
+                self.search(criteria)
+                self.assertEqual(search_cache.stats()["hits"], hits + 1)
+            misses = search_cache.stats()["misses"]
+            with mock.patch("time.monotonic", return_value=106):
+                self.assertEqual(self.search(criteria),
+                                 sorted([self.with_wifi.id, self.plain.id]))
+            self.assertEqual(search_cache.stats()["misses"], misses + 1)
+            self.assertEqual(search_cache.stats()["hits"], hits + 1)
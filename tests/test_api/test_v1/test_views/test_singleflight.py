@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+"""
+Contains the TestSingleFlightDocs and TestCoalesce classes
+"""
+
+from api.v1.app import app
+from api.v1.views import singleflight
+from flask import Response
+import inspect
+import pep8
+import threading
+import time
+import unittest
+coalesce = singleflight.coalesce
+flights = singleflight.flights
+
+
+class TestSingleFlightDocs(unittest.TestCase):
+    """Tests to check the documentation and style of singleflight"""
+    def test_pep8_conformance_singleflight(self):
+        """Test that api/v1/views/singleflight.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/singleflight.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_singleflight.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_singleflight_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(singleflight.__doc__) >= 1)
+        for func in inspect.getmembers(singleflight, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+class TestCoalesce(unittest.TestCase):
+    """Test coalesce with concurrent identical requests"""
+    followers = 7
+
+    def run_requests(self, key, view, limit=1024):
+        """calls coalesce(key, view, limit) from the leader and the
+        followers at once, the leader's view waiting for every follower
+        to join; returns the bodies or exceptions, by request"""
+        joined = flights.stats()['followers'] + self.followers
+        results = [None] * (self.followers + 1)
+
+        def request(i):
+            """one request, run in its own thread"""
+            with app.test_request_context():
+                try:
+                    response = coalesce(key, view, limit)
+                    results[i] = response.get_data()
+                except Exception as error:
+                    results[i] = error
+
+        leader = threading.Thread(target=request, args=(0,))
+        leader.start()
+        while flights.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        threads = [threading.Thread(target=request, args=(i,))
+                   for i in range(1, self.followers + 1)]
+        for thread in threads:
+            thread.start()
+        while flights.stats()['followers'] < joined:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads + [leader]:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        return results
+
+    def setUp(self):
+        """Creates the event releasing the leader's view"""
+        self.release = threading.Event()
+        self.calls = 0
+
+    def view(self, chunks):
+        """returns a view counting its calls and streaming chunks once
+        released"""
+        def view():
+            """waits for the followers, then streams chunks"""
+            self.calls += 1
+            self.release.wait(5)
+            return Response(iter(chunks))
+        return view
+
+    def test_one_computation(self):
+        """Test that one computation serves every identical request"""
+        results = self.run_requests("one", self.view([b"[1,", b"2]"]))
+        self.assertEqual(results, [b"[1,2]"] * (self.followers + 1))
+        self.assertEqual(self.calls, 1)
+
+    def test_body_over_limit(self):
+        """Test that followers compute their own body when it is over the
+        limit"""
+        results = self.run_requests("large", self.view([b"x" * 10] * 3),
+                                    limit=15)
+        self.assertEqual(results, [b"x" * 30] * (self.followers + 1))
+        self.assertEqual(self.calls, self.followers + 1)
+
+    def test_failing_leader(self):
+        """Test that a failing leader does not wedge the followers"""
+        def view():
+            """fails for the leader only"""
+            self.calls += 1
+            if self.calls == 1:
+                self.release.wait(5)
+                raise ValueError("leader failed")
+            return Response(iter([b"[]"]))
+
+        start = time.monotonic()
+        results = self.run_requests("failing", view)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(results[1:], [b"[]"] * self.followers)
+        self.assertLess(time.monotonic() - start, singleflight.WAIT)
+        self.assertEqual(flights.stats()['in_flight'], 0)
+
+    def test_streams_before_shared(self):
+        """Test that the leader gets its first chunk before the body is
+        computed, and the followers the whole body once it is"""
+        rest = threading.Event()
+
+        def chunks():
+            """yields the first chunk, then the rest once released"""
+            yield b"[1,"
+            rest.wait(5)
+            yield b"2]"
+
+        with app.test_request_context():
+            response = coalesce("stream", lambda: Response(chunks()), 1024)
+            body = iter(response.response)
+            self.assertEqual(next(body), b"[1,")
+            self.assertEqual(flights.stats()['in_flight'], 1)
+            shared = []
+
+            def follow():
+                """an identical request, sharing the leader's body"""
+                with app.test_request_context():
+                    shared.append(coalesce("stream", lambda: Response(
+                        [b"own"]), 1024).get_data())
+            joined = flights.stats()['followers'] + 1
+            follower = threading.Thread(target=follow)
+            follower.start()
+            while flights.stats()['followers'] < joined:
+                time.sleep(0.001)
+            rest.set()
+            self.assertEqual(b"".join(body), b"2]")
+            response.close()
+            follower.join(5)
+        self.assertEqual(shared, [b"[1,2]"])
+        self.assertEqual(flights.stats()['in_flight'], 0)
+
+    def test_closed_early(self):
+        """Test that a leader whose client goes away does not wedge the
+        followers"""
+        with app.test_request_context():
+            response = coalesce("closed", lambda: Response(
+                iter([b"[1,", b"2]"])), 1024)
+            self.assertEqual(next(iter(response.response)), b"[1,")
+            response.close()
+        self.assertEqual(flights.stats()['in_flight'], 0)
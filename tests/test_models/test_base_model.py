@@ -2,6 +2,7 @@
 """Test BaseModel for expected behavior and documentation"""
 from datetime import datetime
 import inspect
+import json
 import models
 import pep8 as pycodestyle
 import time
@@ -138,6 +139,56 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_from_storage(self):
+        """test that from_storage rebuilds the instance to_dict saved"""
+        bm = BaseModel()
+        bm.created_at = bm.created_at.replace(microsecond=0)
+        bm.name = "Holberton"
+        d = bm.to_dict(save_fs=True)
+        self.assertTrue(d["created_at"].endswith(".000000"))
+        new = BaseModel.from_storage(d)
+        self.assertIs(type(new), BaseModel)
+        self.assertEqual(new.__dict__, bm.__dict__)
+        self.assertEqual(new.to_dict(), bm.to_dict())
+
+    def test_to_json(self):
+        """test that to_json caches the JSON of to_dict until an attribute
+        is set"""
+        bm = BaseModel()
+        bm.name = "Holberton"
+        text = bm.to_json()
+        self.assertEqual(json.loads(text), bm.to_dict())
+        self.assertIs(bm.to_json(), text)
+        bm.name = "Betty"
+        self.assertEqual(json.loads(bm.to_json())["name"], "Betty")
+
+    def test_fragments_bound(self):
+        """test that the JSON texts cached are bounded by their length,
+        dropping the least recently used first"""
+        fragments = models.base_model.Fragments(10)
+        fragments.put("a", 1, "aaaa")
+        fragments.put("b", 1, "bbbb")
+        self.assertEqual(fragments.get("a", 1), "aaaa")
+        self.assertIsNone(fragments.get("a", 2))
+        fragments.put("c", 1, "cccc")
+        self.assertNotIn("b", fragments)
+        self.assertEqual(fragments.size(), 8)
+        fragments.put("d", 1, "d" * 11)
+        self.assertNotIn("d", fragments)
+        fragments.pop("a")
+        self.assertEqual((len(fragments), fragments.size()), (1, 4))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_to_dict_db(self):
+        """test that to_dict and str work on BaseModel, which is not mapped
+        to a table in DB mode"""
+        bm = BaseModel()
+        bm.name = "Holberton"
+        d = bm.to_dict()
+        self.assertEqual(d["__class__"], "BaseModel")
+        self.assertEqual(d["name"], "Holberton")
+        self.assertIn(bm.id, str(bm))
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Contains the TestBitmapIndexDocs and TestBitmapIndex classes
+"""
+
+import inspect
+from models.engine import bitmap_index
+import pep8
+import unittest
+BitmapIndex = bitmap_index.BitmapIndex
+
+
+class TestBitmapIndexDocs(unittest.TestCase):
+    """Tests to check the documentation and style of BitmapIndex class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.bi_f = inspect.getmembers(BitmapIndex, inspect.isfunction)
+
+    def test_pep8_conformance_bitmap_index(self):
+        """Test that models/engine/bitmap_index.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/bitmap_index.py',
+                                    'tests/test_models/test_engine/\
+test_bitmap_index.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_bitmap_index_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(bitmap_index.__doc__) >= 1)
+        self.assertTrue(len(BitmapIndex.__doc__) >= 1)
+        for func in self.bi_f:
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Test the BitmapIndex class"""
+
+    def test_having_all(self):
+        """Test that having_all ANDs the bitmaps of the labels"""
+        index = BitmapIndex()
+        for i in range(100):
+            index.add(i, [n for n in (2, 3, 5) if i % n == 0])
+        self.assertEqual(index.having_all([2, 3]), list(range(0, 100, 6)))
+        self.assertEqual(index.having_all([5]), list(range(0, 100, 5)))
+        self.assertEqual(index.having_all([2, 7]), [])
+        self.assertEqual(index.having_all([2, 3], keys=[6, 8, 12]),
+                         [6, 12])
+        self.assertCountEqual(index.labels(30), [2, 3, 5])
+
+    def test_add_and_remove(self):
+        """Test that keys can be relabeled and removed, reusing rows"""
+        index = BitmapIndex()
+        index.add("a", ["wifi", "pool"])
+        index.add("b", ["wifi"])
+        self.assertEqual(len(index), 2)
+        index.add("a", ["pool"])
+        self.assertEqual(index.having_all(["wifi"]), ["b"])
+        index.remove("b")
+        index.remove("b")
+        self.assertEqual(index.having_all(["wifi"]), [])
+        index.add("c", ["wifi", "pool"])
+        self.assertCountEqual(index.having_all(["pool"]), ["a", "c"])
+        index.add("c", [])
+        self.assertEqual(index.having_all(["pool"]), ["a"])
+        self.assertEqual(len(index), 1)
@@ -113,3 +113,104 @@ class TestFileStorage(unittest.TestCase):
         storage.save()
         c = storage.count()
         self.assertEqual(len(storage.all()), c)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_many_and_counts(self):
+        """Tests get_many and counts"""
+        storage = models.storage
+        first = State(name="first")
+        second = State(name="second")
+        storage.new(first)
+        storage.new(second)
+        storage.save()
+        found = storage.get_many(State, [second.id, "nope", first.id])
+        self.assertEqual(found, [second, first])
+        counts = storage.counts()
+        self.assertCountEqual(counts.keys(), classes.keys())
+        self.assertEqual(counts["State"], storage.count(State))
+        self.assertEqual(sum(counts.values()), storage.count())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_load(self):
+        """Tests that all loads the requested relationships up front"""
+        storage = models.storage
+        state = State(name="loaded")
+        storage.new(state)
+        city = City(name="city", state_id=state.id)
+        storage.new(city)
+        storage.save()
+        storage.close()
+        states = storage.all(State, load=["cities.places"])
+        loaded = states["State." + state.id]
+        self.assertIn("cities", loaded.__dict__)
+        self.assertEqual([c.id for c in loaded.cities], [city.id])
+        self.assertNotIn("cities", loaded.to_dict())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_search_places(self):
+        """Tests search_places filters by state, city and amenities"""
+        storage = models.storage
+        user = User(email="search@mail.com", password="pwd")
+        state = State(name="searched")
+        city = City(name="city", state_id=state.id)
+        wifi = Amenity(name="wifi")
+        pool = Amenity(name="pool")
+        both = Place(name="both", city_id=city.id, user_id=user.id)
+        one = Place(name="one", city_id=city.id, user_id=user.id)
+        for obj in (user, state, city, wifi, pool, both, one):
+            storage.new(obj)
+        both.amenities.extend([wifi, pool])
+        one.amenities.append(wifi)
+        storage.save()
+        found = storage.search_places(states=[state.id])
+        self.assertCountEqual(found, [both, one])
+        found = storage.search_places(states=[state.id], ids_only=True)
+        self.assertCountEqual(found, [both.id, one.id])
+        found = storage.search_places(cities=[city.id],
+                                      amenities=[wifi.id, pool.id])
+        self.assertEqual(found, [both])
+        self.assertEqual(storage.search_places(amenities=[pool.id, "x"]),
+                         [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_page(self):
+        """Tests page walks a foreign key group in id order"""
+        storage = models.storage
+        state = State(name="paged")
+        cities = [City(name="c", state_id=state.id) for i in range(4)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        storage.save()
+        ids = sorted(city.id for city in cities)
+        found = storage.page(City, 2, ids[0], "state_id", state.id)
+        self.assertEqual([c.id for c in found], ids[1:3])
+        found = storage.page("City", 5, ids[2], "state_id", state.id)
+        self.assertEqual([c.id for c in found], ids[3:])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_version(self):
+        """Tests version changes when objects of its class change, even
+        when the number of rows and latest updated_at stay the same"""
+        storage = models.storage
+        tag = storage.version(Amenity)[0]
+        other = storage.version(State)
+        amenity = Amenity(name="versioned")
+        storage.new(amenity)
+        storage.save()
+        self.assertNotEqual(storage.version(Amenity)[0], tag)
+        self.assertEqual(storage.version(State), other)
+        self.assertGreaterEqual(storage.version("Amenity")[1],
+                                amenity.updated_at.replace(microsecond=0))
+        newest = Amenity(name="newest")
+        storage.new(newest)
+        storage.save()
+        tag = storage.version(Amenity)[0]
+        amenity.name = "renamed"
+        storage.save()
+        self.assertNotEqual(storage.version(Amenity)[0], tag)
+        tag = storage.version()[0]
+        storage.delete(amenity)
+        storage.save()
+        self.assertNotEqual(storage.version()[0], tag)
+        storage.delete(newest)
+        storage.save()
@@ -0,0 +1,372 @@
+#!/usr/bin/python3
+"""
+Contains the TestDBMStorageDocs and TestDBMStorage classes
+"""
+
+import inspect
+import models
+from models.engine import dbm_storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import tempfile
+import unittest
+from unittest import mock
+DBMStorage = dbm_storage.DBMStorage
+
+
+class TestDBMStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of DBMStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.dbms_f = inspect.getmembers(DBMStorage, inspect.isfunction)
+
+    def test_pep8_conformance_dbm_storage(self):
+        """Test that models/engine/dbm_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/dbm_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_dbm_storage(self):
+        """Test tests/test_models/test_dbm_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_dbm_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_dbm_storage_module_docstring(self):
+        """Test for the dbm_storage.py module docstring"""
+        self.assertIsNot(dbm_storage.__doc__, None,
+                         "dbm_storage.py needs a docstring")
+        self.assertTrue(len(dbm_storage.__doc__) >= 1,
+                        "dbm_storage.py needs a docstring")
+
+    def test_dbm_storage_class_docstring(self):
+        """Test for the DBMStorage class docstring"""
+        self.assertIsNot(DBMStorage.__doc__, None,
+                         "DBMStorage class needs a docstring")
+        self.assertTrue(len(DBMStorage.__doc__) >= 1,
+                        "DBMStorage class needs a docstring")
+
+    def test_dbms_func_docstrings(self):
+        """Test for the presence of docstrings in DBMStorage methods"""
+        for func in self.dbms_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing dbm storage")
+class TestDBMStorage(unittest.TestCase):
+    """Test the DBMStorage class"""
+    def setUp(self):
+        """Creates a storage on a new database"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = self.open()
+
+    def open(self, budget=None):
+        """returns a storage on the database of the test"""
+        storage = DBMStorage()
+        storage._DBMStorage__path = os.path.join(self.tmp.name, "hbnb")
+        if budget is not None:
+            storage._DBMStorage__budget = budget
+        storage.reload()
+        return storage
+
+    def tearDown(self):
+        """Removes the database"""
+        self.storage.flush()
+        self.storage._DBMStorage__db.close()
+        self.tmp.cleanup()
+
+    def test_save_get_and_reload(self):
+        """Test that saved objects are read back from the database"""
+        state = State(name="Georgia")
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.storage.save()
+        self.storage.reload()
+        stored = self.storage.get("State", state.id)
+        self.assertIsNot(stored, state)
+        self.assertEqual(stored.to_dict(), state.to_dict())
+        self.assertIs(self.storage.get(State, state.id), stored)
+        self.assertIsNone(self.storage.get(State, "nope"))
+
+    def test_all_and_count(self):
+        """Test all and count with and without a class"""
+        state = State(name="Florida")
+        city = City(name="Miami", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(list(self.storage.all(State)),
+                         ["State." + state.id])
+        self.assertEqual(len(self.storage.all()), 2)
+        self.assertIn("City." + city.id, self.storage.all())
+        self.assertNotIn("City." + city.id, self.storage.all(State))
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.storage.count("Amenity"), 0)
+
+    def test_delete(self):
+        """Test that deleted objects are removed on save"""
+        amenity = Amenity(name="Wifi")
+        self.storage.new(amenity)
+        self.storage.save()
+        self.storage.delete(amenity)
+        self.assertIsNone(self.storage.get(Amenity, amenity.id))
+        self.storage.save()
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(Amenity, amenity.id))
+        self.assertEqual(self.storage.count(Amenity), 0)
+
+    def test_related_and_get_many(self):
+        """Test related on an indexed foreign key and get_many"""
+        user = User(email="a@b.c", password="pwd")
+        city = City(name="Tampa")
+        other = City(name="Orlando")
+        places = [Place(name="p{}".format(i), city_id=city.id,
+                        user_id=user.id) for i in range(3)]
+        for obj in [user, city, other] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.reload()
+        found = self.storage.related(Place, "city_id", city.id)
+        self.assertCountEqual([p.id for p in found], [p.id for p in places])
+        found[0].city_id = other.id
+        self.storage.new(found[0])
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(len(self.storage.related(Place, "city_id",
+                                                  city.id)), 2)
+        self.assertEqual([p.id for p in self.storage.related(
+            Place, "city_id", other.id)], [found[0].id])
+        ids = [places[2].id, "nope", places[0].id]
+        self.assertEqual([p.id for p in self.storage.get_many(Place, ids)],
+                         [places[2].id, places[0].id])
+
+    def test_search_places(self):
+        """Test search_places by states, cities and amenities"""
+        state = State(name="Utah")
+        city = City(name="Provo", state_id=state.id)
+        other = City(name="Ogden")
+        wifi = Amenity(name="Wifi")
+        both = Place(name="Both", city_id=city.id, amenity_ids=[wifi.id])
+        none = Place(name="None", city_id=other.id)
+        for obj in (state, city, other, wifi, both, none):
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.reload()
+        found = self.storage.search_places(states=[state.id])
+        self.assertEqual([p.id for p in found], [both.id])
+        found = self.storage.search_places(states=[state.id],
+                                           cities=[other.id])
+        self.assertCountEqual([p.id for p in found], [both.id, none.id])
+        found = self.storage.search_places(amenities=[wifi.id])
+        self.assertEqual([p.id for p in found], [both.id])
+        self.assertEqual(self.storage.search_places(amenities=[wifi.id],
+                                                    ids_only=True),
+                         [both.id])
+
+    def test_search_amenity_index(self):
+        """Test that search_places finds the places with every amenity
+        from their link index records, kept up to date by save, and
+        matches the places not saved yet"""
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        places = [Place(name="p{}".format(i), amenity_ids=[wifi.id])
+                  for i in range(4)]
+        places[0].amenity_ids = [wifi.id, pool.id]
+        for obj in [wifi, pool] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.reload()
+        ids = sorted(place.id for place in places)
+        db = self.storage._DBMStorage__db
+        self.assertTrue(db.get("#Place.amenity_ids={}\n1".format(
+            pool.id).encode()))
+        with mock.patch.object(self.storage, "load",
+                               side_effect=AssertionError):
+            self.assertEqual(self.storage.search_places(
+                amenities=[wifi.id, pool.id], ids_only=True),
+                [places[0].id])
+        self.assertEqual(self.storage.search_places(
+            amenities=[wifi.id], after=ids[0], limit=2, ids_only=True),
+            ids[1:3])
+        place = self.storage.get(Place, places[0].id)
+        self.assertTrue(self.storage.unlink_amenity(place, pool))
+        self.storage.new(place)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.search_places(amenities=[pool.id]),
+                         [])
+        self.storage.delete(self.storage.get(Place, places[1].id))
+        pending = Place(name="pending", amenity_ids=[pool.id, wifi.id])
+        self.storage.new(pending)
+        self.assertEqual(self.storage.search_places(amenities=[pool.id],
+                                                    ids_only=True),
+                         [pending.id])
+        self.assertCountEqual(self.storage.search_places(
+            amenities=[wifi.id], ids_only=True),
+            [places[0].id, places[2].id, places[3].id, pending.id])
+
+    def test_page(self):
+        """Test that page walks objects in id order after a cursor"""
+        city = City(name="Reno")
+        places = [Place(name="p", city_id=city.id) for i in range(5)]
+        for obj in [city] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.reload()
+        ids = sorted(place.id for place in places)
+        found = self.storage.page(Place, 2, ids[0], "city_id", city.id)
+        self.assertEqual([p.id for p in found], ids[1:3])
+        found = self.storage.page(Place, 10, ids[2])
+        self.assertEqual([p.id for p in found], ids[3:])
+
+    def test_version(self):
+        """Test that the version of a class follows saved changes"""
+        self.assertEqual(self.storage.version(State)[1], None)
+        state = State(name="Iowa")
+        self.storage.new(state)
+        self.storage.save()
+        tag, when = self.storage.version(State)
+        self.assertIsNotNone(when)
+        self.assertEqual(self.storage.version(State), (tag, when))
+        other = self.storage.version()
+        self.storage.new(City(name="Ames", state_id=state.id))
+        self.storage.save()
+        self.assertEqual(self.storage.version(State)[0], tag)
+        self.assertNotEqual(self.storage.version()[0], other[0])
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertNotEqual(self.storage.version(State)[0], tag)
+
+    def test_version_new_database(self):
+        """Test that the same changes on a new database get another tag"""
+        tags = []
+        for i in range(3):
+            self.storage.flush()
+            self.storage._DBMStorage__db.close()
+            for name in os.listdir(self.tmp.name):
+                os.remove(os.path.join(self.tmp.name, name))
+            self.storage = self.open()
+            self.storage.new(State(name="s{}".format(i)))
+            self.storage.save()
+            tags.append(self.storage.version(State)[0])
+        self.assertEqual(len(set(tags)), 3)
+        self.storage.reload()
+        self.assertEqual(self.storage.version(State)[0], tags[-1])
+
+    def test_working_set(self):
+        """Test that the objects in memory stay within the budget while
+        every object is still read from disk"""
+        self.storage.flush()
+        self.storage._DBMStorage__db.close()
+        self.storage = self.open(budget=1000)
+        states = [State(name="s{}".format(i)) for i in range(50)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.assertLessEqual(self.storage._DBMStorage__bytes, 1000)
+        for state in states:
+            self.assertEqual(self.storage.get(State, state.id).name,
+                             state.name)
+        self.assertLessEqual(self.storage._DBMStorage__bytes, 1000)
+        self.assertEqual(len(self.storage.all(State).values()), 50)
+        loaded = self.storage.get(State, states[0].id)
+        with mock.patch("models.storage", self.storage):
+            loaded.name = "changed"
+        for state in states[1:]:
+            self.storage.get(State, state.id)
+        self.assertIs(self.storage.get(State, states[0].id), loaded)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, states[0].id).name,
+                         "changed")
+
+    def test_index_deltas(self):
+        """Test that saves append deltas to the index records, folded
+        into them every FOLD_DELTAS deltas"""
+        city = City(name="Boise")
+        places = []
+        for i in range(dbm_storage.FOLD_DELTAS + 3):
+            place = Place(name="p{}".format(i), city_id=city.id)
+            places.append(place)
+            self.storage.new(place)
+            self.storage.save()
+        self.storage.delete(places[0])
+        self.storage.save()
+        self.storage.reload()
+        db = self.storage._DBMStorage__db
+        key = "#Place.city_id=" + city.id
+        self.assertTrue(db.get(key.encode()))
+        self.assertTrue(db.get((key + "\n3").encode()))
+        self.assertFalse(db.get((key + "\n4").encode()))
+        ids = sorted(place.id for place in places[1:])
+        self.assertEqual(sorted(p.id for p in self.storage.related(
+            Place, "city_id", city.id)), ids)
+        self.assertEqual(sorted(self.storage.all(Place)),
+                         ["Place." + id for id in ids])
+        self.assertEqual(len(self.storage.all(Place)), len(ids))
+        self.assertEqual([p.id for p in self.storage.page(Place, 2)],
+                         ids[:2])
+
+    def test_keys_read_class_index(self):
+        """Test that listing a class does not read the keys of the
+        database"""
+        self.storage.new(State(name="Ohio"))
+        self.storage.new(City(name="Akron"))
+        self.storage.save()
+        with mock.patch.object(self.storage._DBMStorage__db, "keys",
+                               side_effect=AssertionError):
+            self.assertEqual(len(self.storage.all(State)), 1)
+            self.assertEqual(len(self.storage.page(City, 10)), 1)
+
+    def test_flush(self):
+        """Test that saves are flushed at most every flush interval"""
+        self.storage._DBMStorage__flush_interval = 60
+        db = self.storage._DBMStorage__db
+        with mock.patch.object(db, "sync", wraps=db.sync) as sync:
+            for i in range(3):
+                self.storage.new(State(name="s{}".format(i)))
+                self.storage.save()
+            self.assertLessEqual(sync.call_count, 1)
+            self.storage.flush()
+            self.assertLessEqual(sync.call_count, 2)
+            self.assertFalse(self.storage._DBMStorage__unflushed)
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 3)
+
+    def test_compact(self):
+        """Test that compact drops the deleted records and the space of
+        the overwritten ones"""
+        state = State(name="s")
+        other = State(name="gone")
+        self.storage.new(other)
+        for i in range(50):
+            state.name = "s" * (10 * i)
+            self.storage.new(state)
+            self.storage.save()
+        self.storage.delete(other)
+        self.storage.save()
+        self.storage.flush()
+        before = self.storage._DBMStorage__size()
+        self.storage.compact()
+        self.assertLess(self.storage._DBMStorage__size(), before)
+        db = self.storage._DBMStorage__db
+        self.assertNotIn(("State." + other.id).encode(), db.keys())
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, state.name)
+        self.assertEqual(list(self.storage.all(State)), ["State." + state.id])
+        self.assertFalse(os.path.exists(os.path.join(
+            self.tmp.name, "hbnb.compact.dat")))
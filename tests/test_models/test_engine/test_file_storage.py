@@ -16,7 +16,9 @@ from models.state import State
 from models.user import User
 import json
 import os
+import threading
 import pep8
+import time
 import unittest
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -70,7 +72,8 @@ test_file_storage.py'])
 
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
     def test_all_returns_dict(self):
         """Test that all returns the FileStorage.__objects attr"""
         storage = FileStorage()
@@ -78,7 +81,8 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(type(new_dict), dict)
         self.assertIs(new_dict, storage._FileStorage__objects)
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
     def test_new(self):
         """test that new adds an object to the FileStorage.__objects attr"""
         storage = FileStorage()
@@ -94,7 +98,8 @@ class TestFileStorage(unittest.TestCase):
                 self.assertEqual(test_dict, storage._FileStorage__objects)
         FileStorage._FileStorage__objects = save
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
     def test_save(self):
         """Test that save properly saves objects to file.json"""
         storage = FileStorage()
@@ -114,7 +119,8 @@ class TestFileStorage(unittest.TestCase):
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
     def test_get(self):
         """ Tests the get method works properly."""
         self.storage = FileStorage()
@@ -127,7 +133,8 @@ class TestFileStorage(unittest.TestCase):
         retrieved_instance = self.storage.get(State, instance.id)
         self.assertEqual(retrieved_instance, instance)
 
-    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
     def test_count(self):
         """ Tests the count method works properly."""
         self.storage = FileStorage()
@@ -141,3 +148,450 @@ class TestFileStorage(unittest.TestCase):
         self.storage.save()
         c = self.storage.count()
         self.assertEqual(len(self.storage.all()), c)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_all_cls_partition(self):
+        """Test that all(cls) only returns objects of that class"""
+        storage = FileStorage()
+        state = State(name="California")
+        city = City(name="Fresno")
+        storage.new(state)
+        storage.new(city)
+        states = storage.all(State)
+        self.assertIn("State." + state.id, states)
+        self.assertNotIn("City." + city.id, states)
+        self.assertEqual(states, storage.all("State"))
+        for obj in states.values():
+            self.assertIs(type(obj), State)
+        storage.delete(state)
+        storage.delete(city)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_count_cls(self):
+        """Test that count(cls) follows new and delete"""
+        storage = FileStorage()
+        before = storage.count(State)
+        state = State(name="Nevada")
+        storage.new(state)
+        self.assertEqual(storage.count(State), before + 1)
+        self.assertEqual(storage.count("State"), before + 1)
+        storage.delete(state)
+        self.assertEqual(storage.count(State), before)
+        self.assertEqual(storage.count(), len(storage.all()))
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_get_by_name_and_missing(self):
+        """Test get with a class name, an unknown id and an unknown class"""
+        storage = FileStorage()
+        state = State(name="Oregon")
+        storage.new(state)
+        self.assertIs(storage.get("State", state.id), state)
+        self.assertIsNone(storage.get(City, state.id))
+        self.assertIsNone(storage.get(State, "nope"))
+        self.assertIsNone(storage.get("Nope", state.id))
+        storage.delete(state)
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_get_many(self):
+        """Test that get_many returns the objects found, in order"""
+        storage = FileStorage()
+        first = State(name="Utah")
+        second = State(name="Idaho")
+        storage.new(first)
+        storage.new(second)
+        found = storage.get_many(State, [second.id, "nope", first.id])
+        self.assertEqual(found, [second, first])
+        self.assertEqual(storage.get_many("City", [first.id]), [])
+        storage.delete(first)
+        storage.delete(second)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_related_follows_changes(self):
+        """Test that the foreign key indexes follow new, setattr, delete"""
+        storage = FileStorage()
+        state = State(name="Texas")
+        other = State(name="Ohio")
+        city = City(name="Austin", state_id=state.id)
+        for obj in (state, other, city):
+            storage.new(obj)
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        self.assertEqual(state.cities, [city])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        storage.delete(city)
+        self.assertEqual(other.cities, [])
+        storage.delete(state)
+        storage.delete(other)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_related_places_and_reviews(self):
+        """Test City.places, Place.reviews, User.places and User.reviews"""
+        storage = FileStorage()
+        user = User(email="a@b.c", password="pwd")
+        city = City(name="Dallas")
+        place = Place(name="Loft", city_id=city.id, user_id=user.id)
+        review = Review(text="ok", place_id=place.id, user_id=user.id)
+        for obj in (user, city, place, review):
+            storage.new(obj)
+        self.assertEqual(city.places, [place])
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(user.places, [place])
+        self.assertEqual(user.reviews, [review])
+        for obj in (user, city, place, review):
+            storage.delete(obj)
+        self.assertEqual(city.places, [])
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_search_places(self):
+        """Test search_places unites states and cities and intersects
+        amenities, following changes to amenity_ids"""
+        storage = FileStorage()
+        state = State(name="Utah")
+        city = City(name="Provo", state_id=state.id)
+        other = City(name="Ogden")
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        both = Place(name="Both", city_id=city.id,
+                     amenity_ids=[wifi.id, pool.id])
+        one = Place(name="One", city_id=other.id, amenity_ids=[wifi.id])
+        objs = (state, city, other, wifi, pool, both, one)
+        for obj in objs:
+            storage.new(obj)
+        self.assertEqual(storage.search_places(states=[state.id]), [both])
+        self.assertEqual(storage.search_places(states=[state.id],
+                                               ids_only=True), [both.id])
+        self.assertCountEqual(storage.search_places(
+            states=[state.id], cities=[other.id, city.id]), [both, one])
+        self.assertEqual(storage.search_places(
+            cities=[other.id], amenities=[wifi.id, pool.id]), [])
+        found = storage.search_places(amenities=[wifi.id, pool.id])
+        self.assertEqual(found, [both])
+        self.assertEqual(storage.search_places(amenities=["nope"]), [])
+        one.amenity_ids = [wifi.id, pool.id]
+        self.assertCountEqual(storage.search_places(
+            amenities=[pool.id]), [both, one])
+        storage.delete(both)
+        self.assertEqual(storage.search_places(amenities=[pool.id]), [one])
+        for obj in objs:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_link_amenity(self):
+        """Test link_amenity and unlink_amenity update the search"""
+        storage = FileStorage()
+        wifi = Amenity(name="Wifi")
+        place = Place(name="Cabin")
+        storage.new(wifi)
+        storage.new(place)
+        self.assertTrue(storage.link_amenity(place, wifi))
+        self.assertFalse(storage.link_amenity(place, wifi))
+        self.assertEqual(place.amenity_ids, [wifi.id])
+        self.assertEqual(storage.search_places(amenities=[wifi.id]), [place])
+        self.assertTrue(storage.unlink_amenity(place, wifi))
+        self.assertFalse(storage.unlink_amenity(place, wifi))
+        self.assertEqual(storage.search_places(amenities=[wifi.id]), [])
+        storage.delete(wifi)
+        storage.delete(place)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_page(self):
+        """Test that page walks a class or a foreign key group in id order,
+        following new, setattr and delete"""
+        storage = FileStorage()
+        city = City(name="Reno")
+        other = City(name="Elko")
+        places = [Place(name="p", city_id=city.id) for i in range(5)]
+        for obj in [city, other] + places:
+            storage.new(obj)
+        ids = sorted(place.id for place in places)
+        first = storage.page(Place, 2, attr="city_id", value=city.id)
+        self.assertEqual([p.id for p in first], ids[:2])
+        rest = storage.page(Place, 10, ids[1], "city_id", city.id)
+        self.assertEqual([p.id for p in rest], ids[2:])
+        moved = storage.get(Place, ids[2])
+        moved.city_id = other.id
+        storage.delete(storage.get(Place, ids[3]))
+        rest = storage.page(Place, 10, ids[1], "city_id", city.id)
+        self.assertEqual([p.id for p in rest], [ids[4]])
+        found = storage.page("Place", 10, attr="city_id", value=other.id)
+        self.assertEqual(found, [moved])
+        self.assertEqual(storage.search_places(cities=[city.id], limit=2,
+                                               after=ids[0]),
+                         [storage.get(Place, ids[1]),
+                          storage.get(Place, ids[4])])
+        for obj in [city, other] + places:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_version(self):
+        """Test that the versions change on new, setattr and delete, for
+        the class changed and for all classes"""
+        storage = FileStorage()
+        state = State(name="Iowa")
+        tag, when = storage.version(State)
+        other = storage.version(City)
+        storage.new(state)
+        self.assertNotEqual(storage.version(State)[0], tag)
+        self.assertEqual(storage.version(City), other)
+        tag, when = storage.version(State)
+        everything = storage.version()
+        self.assertIsInstance(when, datetime)
+        self.assertEqual(storage.version(State), (tag, when))
+        state.name = "Ohio"
+        self.assertNotEqual(storage.version("State")[0], tag)
+        self.assertNotEqual(storage.version()[0], everything[0])
+        tag = storage.version(State)[0]
+        storage.delete(state)
+        self.assertNotEqual(storage.version(State)[0], tag)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_reload_keeps_password(self):
+        """Test that the hashed password is saved and not hashed again
+        when it is reloaded"""
+        storage = FileStorage()
+        user = User(email="a@b.c", password="pwd")
+        storage.new(user)
+        storage.save()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["User." + user.id]["first_name"] = "Betty"
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        reloaded = storage.get(User, user.id)
+        self.assertIsNot(reloaded, user)
+        self.assertEqual(reloaded.password, user.password)
+        self.assertEqual(reloaded.created_at, user.created_at)
+        storage.delete(reloaded)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_journal_mode(self):
+        """Test that journal mode appends changes and replays them"""
+        path = "file_journal_test.json"
+        storage = FileStorage()
+        storage._FileStorage__journal = True
+        storage._FileStorage__file_path = path
+        storage._FileStorage__pending.clear()
+        storage._FileStorage__removed.clear()
+        try:
+            state = State(name="Kansas")
+            storage.new(state)
+            storage.save()
+            self.assertFalse(os.path.exists(path))
+            with open(path + ".log", "r") as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0]),
+                             {"State." + state.id: state.to_dict()})
+            state.name = "Iowa"
+            storage.save()
+            storage.delete(state)
+            storage.save()
+            with open(path + ".log", "r") as f:
+                self.assertEqual(len(f.readlines()), 3)
+            storage.new(state)
+            storage._FileStorage__pending.clear()
+            storage.reload()
+            self.assertIsNone(storage.get(State, state.id))
+            storage.new(state)
+            storage.compact()
+            with open(path + ".log", "r") as f:
+                self.assertEqual(f.read(), "")
+            with open(path, "r") as f:
+                self.assertEqual(json.load(f)["State." + state.id]["name"],
+                                 "Iowa")
+            storage.delete(state)
+        finally:
+            for name in (path, path + ".log", path + ".lock"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_compact_keeps_other_writers(self):
+        """Test that compact applies the records other processes appended
+        to the journal before replacing it"""
+        path = "file_journal_test.json"
+        storage = FileStorage()
+        storage._FileStorage__journal = True
+        storage._FileStorage__file_path = path
+        try:
+            state = State(name="Ohio")
+            storage.new(state)
+            storage.save()
+            other = State(name="Utah")
+            with open(path + ".log", "a") as f:
+                f.write(json.dumps({"State." + other.id: other.to_dict()}) +
+                        "\n")
+            inode = os.stat(path + ".log").st_ino
+            storage.compact()
+            self.assertEqual(os.path.getsize(path + ".log"), 0)
+            self.assertNotEqual(os.stat(path + ".log").st_ino, inode)
+            with open(path, "r") as f:
+                js = json.load(f)
+            self.assertEqual(js["State." + other.id]["name"], "Utah")
+            self.assertEqual(js["State." + state.id]["name"], "Ohio")
+            self.assertEqual(storage.get(State, other.id).name, "Utah")
+            storage.delete(state)
+            storage.delete(storage.get(State, other.id))
+        finally:
+            for name in (path, path + ".log", path + ".lock"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_save_reuses_clean_objects(self):
+        """Test that save only serializes objects changed since the last
+        save and still writes every object"""
+        storage = FileStorage()
+        state = State(name="Maine")
+        city = City(name="Portland", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        fragments = storage._FileStorage__fragments
+        self.assertIn("State." + state.id, fragments)
+        self.assertIn("City." + city.id, fragments)
+        city.name = "Bangor"
+        self.assertNotIn("City." + city.id, fragments)
+        self.assertIn("State." + state.id, fragments)
+        storage.save()
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        self.assertEqual(js["City." + city.id], city.to_dict())
+        self.assertEqual(js["State." + state.id], state.to_dict())
+        storage.delete(state)
+        storage.delete(city)
+        self.assertNotIn("State." + state.id, fragments)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_reload_only_when_changed(self):
+        """Test that reload skips an unchanged file and only rebuilds the
+        records that changed"""
+        storage = FileStorage()
+        state = State(name="Vermont")
+        city = City(name="Burlington", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        storage.close()
+        self.assertIs(storage.get(State, state.id), state)
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + state.id]["name"] = "New Mexico"
+        with open("file.json", "w") as f:
+            json.dump(js, f)
+        storage.close()
+        reloaded = storage.get(State, state.id)
+        self.assertIsNot(reloaded, state)
+        self.assertEqual(reloaded.name, "New Mexico")
+        self.assertIs(storage.get(City, city.id), city)
+        storage.delete(reloaded)
+        storage.delete(city)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_write_behind(self):
+        """Test that write-behind saves are flushed by the flusher thread
+        and by flush()"""
+        path = "file_write_behind_test.json"
+        storage = FileStorage()
+        storage._FileStorage__file_path = path
+        storage._FileStorage__flush_interval = 0.05
+        try:
+            state = State(name="Alaska")
+            storage.new(state)
+            storage.save()
+            for i in range(100):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.05)
+            with open(path, "r") as f:
+                self.assertIn("State." + state.id, json.load(f))
+            state.name = "Hawaii"
+            storage.save()
+            storage.flush()
+            with open(path, "r") as f:
+                js = json.load(f)
+            self.assertEqual(js["State." + state.id]["name"], "Hawaii")
+            storage.delete(state)
+            storage.flush()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_threaded_stress(self):
+        """Test concurrent new, delete, reads and saves from many threads"""
+        path = "file_threaded_test.json"
+        storage = FileStorage()
+        storage._FileStorage__file_path = path
+        errors = []
+        kept = []
+
+        def worker():
+            """creates, reads, saves and deletes states"""
+            try:
+                for i in range(200):
+                    state = State(name="s{}".format(i))
+                    storage.new(state)
+                    self.assertIs(storage.get(State, state.id), state)
+                    storage.all(State)
+                    storage.count()
+                    if i % 2:
+                        storage.delete(state)
+                    else:
+                        kept.append(state)
+                    if i % 20 == 0:
+                        storage.save()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for i in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            storage.save()
+            with open(path, "r") as f:
+                js = json.load(f)
+            for state in kept:
+                self.assertIn("State." + state.id, js)
+            self.assertEqual(len(js), len(storage.all()))
+        finally:
+            for state in kept:
+                storage.delete(state)
+            if os.path.exists(path):
+                os.remove(path)
+
+    @unittest.skipIf(models.storage_t not in (None, 'file'),
+                     "not testing file storage")
+    def test_counts(self):
+        """Test that counts returns the count of every class"""
+        storage = FileStorage()
+        counts = storage.counts()
+        self.assertCountEqual(counts.keys(), classes.keys())
+        for name in classes:
+            self.assertEqual(counts[name], storage.count(name))
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""
+Contains the TestJSONBackendDocs and TestJSONBackend classes
+"""
+
+from datetime import datetime
+import inspect
+import json
+from models.base_model import BaseModel, codec
+from models.engine import json_backend
+import pep8
+import unittest
+
+
+class TestJSONBackendDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_backend"""
+    def test_pep8_conformance_json_backend(self):
+        """Test that models/engine/json_backend.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_backend.py',
+                                    'tests/test_models/test_engine/\
+test_json_backend.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_backend_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(json_backend.__doc__) >= 1)
+        for func in inspect.getmembers(json_backend, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__ or "") >= 1,
+                            "{:s} needs a docstring".format(func[0]))
+
+
+class TestJSONBackend(unittest.TestCase):
+    """Test every JSON backend installed"""
+    def test_json_is_a_fallback(self):
+        """Test that the json module is always available and chosen"""
+        self.assertIn("json", json_backend.backends)
+        self.assertIn(json_backend.name, json_backend.backends)
+        self.assertEqual((json_backend.dumps, json_backend.loads),
+                         json_backend.backends[json_backend.name])
+
+    def test_round_trip(self):
+        """Test that every backend writes the same value back"""
+        value = {"name": "Sé ☃ \"/\"", "number": 89, "ratio": 0.5,
+                 "ids": ["a", "b"], "none": None}
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                text = dumps(value)
+                self.assertIs(type(text), str)
+                self.assertEqual(json.loads(text), value)
+                self.assertEqual(loads(text), value)
+                self.assertEqual(loads(text.encode()), value)
+
+    def test_sort_keys(self):
+        """Test that sort_keys writes the keys in order, compactly"""
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                self.assertEqual(dumps({"b": 1, "a": [1, 2]}, True),
+                                 '{"a":[1,2],"b":1}')
+
+    def test_datetimes(self):
+        """Test that datetimes are written in the time format of BaseModel,
+        whole seconds included"""
+        dates = [datetime(2017, 9, 28, 21, 5, 54, 119427),
+                 datetime(2017, 9, 28, 21, 5, 54)]
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                self.assertEqual(loads(dumps(dates)),
+                                 ["2017-09-28T21:05:54.119427",
+                                  "2017-09-28T21:05:54.000000"])
+
+    def test_rebuild(self):
+        """Test that a record written with native datetimes rebuilds its
+        object through __init__"""
+        bm = BaseModel()
+        bm.created_at = bm.created_at.replace(microsecond=0)
+        record = codec(BaseModel).to_dict(bm, True, True)
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                new = BaseModel(**loads(dumps(record)))
+                self.assertEqual(new.to_dict(), bm.to_dict())
+
+    def test_big_integers(self):
+        """Test that integers over 64 bits are written"""
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                self.assertEqual(dumps({"big": 2 ** 70}),
+                                 '{"big":1180591620717411303424}')
+
+    def test_unknown_type(self):
+        """Test that other types are refused"""
+        for name, (dumps, loads) in json_backend.backends.items():
+            with self.subTest(backend=name):
+                with self.assertRaises(TypeError):
+                    dumps({"set": {1}})
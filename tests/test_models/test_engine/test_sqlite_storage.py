@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import tempfile
+import unittest
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqls_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1,
+                        "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1,
+                        "SQLiteStorage class needs a docstring")
+
+    def test_sqls_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqls_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing sqlite storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    def setUp(self):
+        """Creates a storage on a new database file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage()
+        self.storage._SQLiteStorage__path = os.path.join(self.tmp.name,
+                                                         "hbnb.sqlite3")
+        self.storage.reload()
+
+    def tearDown(self):
+        """Removes the database file"""
+        self.storage._SQLiteStorage__local.conn.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        """Test that the database is in WAL mode"""
+        conn = self.storage._SQLiteStorage__connection()
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_save_get_and_close(self):
+        """Test that saved objects are read back from the database"""
+        state = State(name="Georgia")
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.storage.save()
+        self.storage.close()
+        stored = self.storage.get("State", state.id)
+        self.assertIsNot(stored, state)
+        self.assertEqual(stored.to_dict(), state.to_dict())
+        self.assertIsNone(self.storage.get(State, "nope"))
+
+    def test_all_and_count(self):
+        """Test all and count with and without a class"""
+        state = State(name="Florida")
+        city = City(name="Miami", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(list(self.storage.all(State)),
+                         ["State." + state.id])
+        self.assertEqual(len(self.storage.all()), 2)
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.storage.count("Amenity"), 0)
+
+    def test_delete(self):
+        """Test that deleted objects are removed on save"""
+        amenity = Amenity(name="Wifi")
+        self.storage.new(amenity)
+        self.storage.save()
+        self.storage.delete(amenity)
+        self.assertIsNone(self.storage.get(Amenity, amenity.id))
+        self.storage.save()
+        self.storage.close()
+        self.assertIsNone(self.storage.get(Amenity, amenity.id))
+        self.assertEqual(self.storage.count(Amenity), 0)
+
+    def test_related_and_get_many(self):
+        """Test related on an indexed foreign key and get_many"""
+        user = User(email="a@b.c", password="pwd")
+        city = City(name="Tampa")
+        places = [Place(name="p{}".format(i), city_id=city.id,
+                        user_id=user.id) for i in range(3)]
+        for obj in [user, city] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        found = self.storage.related(Place, "city_id", city.id)
+        self.assertCountEqual([p.id for p in found], [p.id for p in places])
+        ids = [places[2].id, "nope", places[0].id]
+        self.assertEqual([p.id for p in self.storage.get_many(Place, ids)],
+                         [places[2].id, places[0].id])
+
+    def test_search_places(self):
+        """Test search_places by states, cities and amenities"""
+        state = State(name="Utah")
+        city = City(name="Provo", state_id=state.id)
+        other = City(name="Ogden")
+        wifi = Amenity(name="Wifi")
+        both = Place(name="Both", city_id=city.id, amenity_ids=[wifi.id])
+        none = Place(name="None", city_id=other.id)
+        for obj in (state, city, other, wifi, both, none):
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        found = self.storage.search_places(states=[state.id])
+        self.assertEqual([p.id for p in found], [both.id])
+        found = self.storage.search_places(states=[state.id],
+                                           cities=[other.id])
+        self.assertCountEqual([p.id for p in found], [both.id, none.id])
+        found = self.storage.search_places(amenities=[wifi.id])
+        self.assertEqual([p.id for p in found], [both.id])
+        self.assertEqual(self.storage.search_places(amenities=[wifi.id],
+                                                    ids_only=True),
+                         [both.id])
+
+    def test_search_amenity_index(self):
+        """Test that search_places finds the places with every amenity
+        from the place_amenity table, kept up to date by save, and
+        matches the places not saved yet"""
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        places = [Place(name="p{}".format(i), amenity_ids=[wifi.id])
+                  for i in range(4)]
+        places[0].amenity_ids = [wifi.id, pool.id]
+        for obj in [wifi, pool] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        ids = sorted(place.id for place in places)
+        conn = self.storage._SQLiteStorage__connection()
+        self.assertEqual(conn.execute(
+            "SELECT COUNT(*) FROM place_amenity").fetchone()[0], 5)
+        self.assertEqual(self.storage.search_places(
+            amenities=[wifi.id, pool.id], ids_only=True), [places[0].id])
+        self.assertEqual(self.storage.search_places(
+            amenities=[wifi.id], after=ids[0], limit=2, ids_only=True),
+            ids[1:3])
+        place = self.storage.get(Place, places[0].id)
+        self.assertTrue(self.storage.unlink_amenity(place, pool))
+        self.storage.new(place)
+        self.storage.save()
+        self.assertEqual(self.storage.search_places(amenities=[pool.id]),
+                         [])
+        self.storage.delete(self.storage.get(Place, places[1].id))
+        pending = Place(name="pending", amenity_ids=[pool.id, wifi.id])
+        self.storage.new(pending)
+        self.assertEqual(self.storage.search_places(amenities=[pool.id],
+                                                    ids_only=True),
+                         [pending.id])
+        self.assertCountEqual(self.storage.search_places(
+            amenities=[wifi.id], ids_only=True),
+            [places[0].id, places[2].id, places[3].id, pending.id])
+        self.storage.save()
+        self.assertEqual(conn.execute(
+            "SELECT COUNT(*) FROM place_amenity WHERE place_id = ?",
+            (places[1].id,)).fetchone()[0], 0)
+
+    def test_page(self):
+        """Test that page walks objects in id order after a cursor"""
+        city = City(name="Reno")
+        places = [Place(name="p", city_id=city.id) for i in range(5)]
+        for obj in [city] + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        ids = sorted(place.id for place in places)
+        found = self.storage.page(Place, 2, ids[0], "city_id", city.id)
+        self.assertEqual([p.id for p in found], ids[1:3])
+        found = self.storage.page(Place, 10, ids[2])
+        self.assertEqual([p.id for p in found], ids[3:])
+
+    def test_version(self):
+        """Test that the version of a class follows saved changes, even
+        those leaving the number of rows and latest updated_at as they
+        were"""
+        self.assertEqual(self.storage.version(State)[1], None)
+        state = State(name="Iowa")
+        self.storage.new(state)
+        self.storage.save()
+        tag, when = self.storage.version(State)
+        self.assertGreaterEqual(when, state.updated_at)
+        self.assertEqual(self.storage.version(State), (tag, when))
+        other = self.storage.version()
+        self.storage.new(City(name="Ames", state_id=state.id))
+        self.storage.save()
+        self.assertEqual(self.storage.version(State)[0], tag)
+        self.assertNotEqual(self.storage.version()[0], other[0])
+        newest = State(name="Utah")
+        self.storage.new(newest)
+        self.storage.save()
+        tag = self.storage.version(State)[0]
+        state.name = "Ohio"
+        self.storage.new(state)
+        self.storage.save()
+        self.assertNotEqual(self.storage.version(State)[0], tag)
+        tag = self.storage.version(State)[0]
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertNotEqual(self.storage.version(State)[0], tag)
+
+    def test_password_kept(self):
+        """Test that the hashed password is stored and not hashed again"""
+        user = User(email="a@b.c", password="pwd")
+        self.storage.new(user)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(User, user.id).password,
+                         user.password)
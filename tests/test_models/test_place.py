@@ -7,7 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import place
-from models.base_model import BaseModel
+from models.base_model import BaseModel, codec
 import pep8
 import unittest
 Place = place.Place
@@ -196,5 +196,25 @@ class TestPlace(unittest.TestCase):
     def test_str(self):
         """test that the str method has the correct output"""
         place = Place()
-        string = "[Place] ({}) {}".format(place.id, place.__dict__)
+        string = "[Place] ({}) {}".format(place.id,
+                                          codec(Place).attributes(place))
         self.assertEqual(string, str(place))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_compact(self):
+        """test that the attributes of Place live in slots, with interned
+        ids, and that to_dict is unchanged"""
+        place = Place(name="Home", city_id="".join(["c", "1"]), rooms=3)
+        self.assertIs(place.city_id, "c1")
+        self.assertIs(type(place.created_at), datetime)
+        self.assertNotIn("name", place.__dict__)
+        self.assertEqual(place.rooms, 3)
+        d = place.to_dict()
+        self.assertCountEqual(d.keys(), ["id", "created_at", "updated_at",
+                                         "name", "city_id", "rooms",
+                                         "__class__"])
+        loaded = Place.from_storage(place.to_dict(save_fs=True))
+        self.assertEqual(loaded.to_dict(), d)
+        self.assertEqual(loaded.created_at, place.created_at)
+        self.assertIs(type(loaded._updated_at), datetime)
+        self.assertEqual(loaded.description, "")
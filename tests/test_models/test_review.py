@@ -7,7 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import review
-from models.base_model import BaseModel
+from models.base_model import BaseModel, codec
 import pep8
 import unittest
 Review = review.Review
@@ -119,5 +119,6 @@ class TestReview(unittest.TestCase):
     def test_str(self):
         """test that the str method has the correct output"""
         review = Review()
-        string = "[Review] ({}) {}".format(review.id, review.__dict__)
+        string = "[Review] ({}) {}".format(review.id,
+                                           codec(Review).attributes(review))
         self.assertEqual(string, str(review))